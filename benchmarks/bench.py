@@ -0,0 +1,318 @@
+"""Benchmarks for the operations behind the GUI buttons, run against synthetic repositories.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench --commits 5000 --files 2000 --save-baseline baseline.json
+    python -m benchmarks.bench --commits 5000 --files 2000 --baseline baseline.json
+
+Each operation goes through the same gitplus code the buttons use (GitExecutor
+for porcelain commands, GitBackend, read_status, CommitIndex, the diff loader)
+without creating a Tk window. A local bare repository stands in for GitHub.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gitplus.backend import GitBackend
+from gitplus.branches import BranchIndex, read_branches
+from gitplus.core import find_git_executable, push_command, remote_commands, run_staged, stage_commands
+from gitplus.diff import read_diff_files, read_file_diff
+from gitplus.discovery import probe_git
+from gitplus.executor import GitExecutor
+from gitplus.history import CommitIndex
+from gitplus.scan import FileScanner
+from gitplus.stash import read_stashes, read_stash_stats, read_stash_patch
+from gitplus.status import read_status
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+IDENTITY = {
+    "GIT_AUTHOR_NAME": "Bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "Bench", "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+def git(git_path, repo, *args, input=None):
+    result = subprocess.run([git_path] + list(args), cwd=repo, input=input, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace')}")
+    return result.stdout
+
+def fast_import_stream(commits, files, big_lines):
+    """Yield a fast-import stream: one commit adding every file, then one file changed per commit."""
+    def blob(text):
+        data = text.encode("utf-8")
+        return b"data %d\n" % len(data) + data + b"\n"
+
+    big = "".join(f"line {i} of the large file\n" for i in range(big_lines))
+    for c in range(commits):
+        out = [b"commit refs/heads/main\n", b"mark :%d\n" % (c + 1),
+               b"committer Bench <bench@example.com> %d +0000\n" % (1600000000 + c * 60),
+               blob(f"Commit {c}: update module {c % max(files, 1)}")]
+        if c:
+            out.append(b"from :%d\n" % c)
+        if c == 0:
+            for f in range(files):
+                out.append(f"M 100644 inline src/pkg{f % 50}/module_{f}.py\n".encode())
+                out.append(blob(f"# module {f}\nVALUE = 0\n"))
+            out.append(b"M 100644 inline big.txt\n")
+            out.append(blob(big))
+        else:
+            f = c % max(files, 1)
+            out.append(f"M 100644 inline src/pkg{f % 50}/module_{f}.py\n".encode())
+            out.append(blob(f"# module {f}\nVALUE = {c}\n"))
+        yield b"".join(out)
+
+def build_repo(git_path, root, commits, files, big_lines, branches, stashes):
+    """Create ``root/work`` (commits, files, branches, stashes, a large unstaged diff) and ``root/remote.git``."""
+    work = os.path.join(root, "work")
+    remote = os.path.join(root, "remote.git")
+    os.makedirs(work)
+    git(git_path, work, "init", "-q")
+    git(git_path, work, "symbolic-ref", "HEAD", "refs/heads/main")
+    marks = os.path.join(root, "marks")
+    proc = subprocess.Popen([git_path, "fast-import", "--quiet", f"--export-marks={marks}"],
+                            cwd=work, stdin=subprocess.PIPE)
+    for chunk in fast_import_stream(commits, files, big_lines):
+        proc.stdin.write(chunk)
+    proc.stdin.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+    git(git_path, work, "reset", "-q", "--hard", "main")
+    with open(marks, "r", encoding="utf-8") as f:
+        oids = [line.split()[1] for line in f if line.strip()]
+    step = max(1, len(oids) // max(branches, 1))
+    updates = "".join(f"create refs/heads/feature/b{i} {oids[(i * step) % len(oids)]}\n" for i in range(branches))
+    git(git_path, work, "update-ref", "--stdin", input=updates.encode())
+    for i in range(stashes):
+        with open(os.path.join(work, "src", "pkg0", "module_0.py"), "a", encoding="utf-8") as f:
+            f.write(f"STASH_{i} = {i}\n")
+        git(git_path, work, "stash", "push", "-q", "-m", f"bench stash {i}")
+    git(git_path, root, "init", "-q", "--bare", remote)
+    git(git_path, work, "remote", "add", "origin", remote)
+    git(git_path, work, "push", "-q", "origin", "main")
+    with open(os.path.join(work, "big.txt"), "w", encoding="utf-8") as f:
+        f.write("".join(f"line {i} {'changed' if i % 2 else 'of the large file'}\n" for i in range(big_lines)))
+    return work, remote
+
+def run_job(executor, command, cwd):
+    """Run one command through the executor like run_git_command does and wait for it."""
+    job, _ = executor.submit(command, cwd, quiet=True)
+    while True:
+        kind, done, _ = executor.events.get()
+        if kind == "done" and done is job:
+            break
+    if not job.ok:
+        raise RuntimeError(f"{' '.join(command)} failed: {job.error_output}")
+    return job
+
+def child_maxrss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def make_operations(git_path, work):
+    executor = GitExecutor()
+    backend = GitBackend(git_path)
+    git_dir = os.path.join(work, ".git")
+    counter = [0]
+    scanner = FileScanner()
+
+    def browse():
+        backend.probe(work)
+
+    def status():
+        read_status(git_path, work)
+
+    def history_cold():
+        index = CommitIndex.for_branch(git_path, work, git_dir, "main")
+        if os.path.exists(index.path):
+            os.remove(index.path)
+        index.update(backend.resolve(work, "main")["main"][0])
+        index.page(0, 200)
+
+    def history_warm():
+        index = CommitIndex.for_branch(git_path, work, git_dir, "main")
+        index.update(backend.resolve(work, "main")["main"][0])
+        index.page(0, 200)
+        index.search("module 7")
+
+    def diff():
+        files = read_diff_files(git_path, work)
+        for f in files:
+            read_file_diff(git_path, work, f, 256 * 1024)
+
+    def add_and_commit():
+        counter[0] += 1
+        with open(os.path.join(work, "src", "pkg1", "module_1.py"), "a", encoding="utf-8") as f:
+            f.write(f"BENCH_{counter[0]} = True\n")
+        results = run_staged(git_path, work, stage_commands(["src/pkg1/module_1.py"], message=f"bench commit {counter[0]}"))
+        if not results[-1].ok:
+            raise RuntimeError(f"commit failed: {results[-1].stderr}")
+
+    def push():
+        for args in remote_commands(backend.remotes(work), backend.remotes(work)["origin"]):
+            run_job(executor, [git_path] + args, work)
+        run_job(executor, [git_path] + push_command("main"), work)
+
+    def fetch():
+        run_job(executor, [git_path, "fetch", "--prune"], work)
+
+    ahead_behind = probe_git(git_path).features.get("ahead_behind", False)
+
+    def branches():
+        listed = read_branches(git_path, work, ahead_behind)
+        BranchIndex(listed).filter("feat", 500)
+
+    def scan_files():
+        scanner.scan(git_path, work)
+
+    def stash_list():
+        stashes = read_stashes(git_path, work)
+        read_stash_stats(git_path, work, stashes)
+        if stashes:
+            read_stash_patch(git_path, work, stashes[0], 256 * 1024)
+
+    operations = [("browse_repository", browse), ("check_git_status", status),
+                  ("show_commit_history (cold)", history_cold), ("show_commit_history (warm)", history_warm),
+                  ("show_diff", diff), ("add_and_commit", add_and_commit), ("push_to_github", push),
+                  ("fetch", fetch), ("show_stash_list", stash_list),
+                  ("scan_large_files", scan_files), ("open_branches", branches)]
+    return operations, executor, backend
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round((len(values) - 1) * pct)))]
+
+def measure(operations, iterations, warmup):
+    results = {}
+    for name, func in operations:
+        for _ in range(warmup):
+            func()
+        samples = []
+        tracemalloc.start()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "max_ms": max(samples) * 1000,
+            "py_peak_kb": peak // 1024,
+        }
+        print(f"{name:28} p50 {results[name]['p50_ms']:9.1f} ms  p95 {results[name]['p95_ms']:9.1f} ms  "
+              f"max {results[name]['max_ms']:9.1f} ms  py peak {results[name]['py_peak_kb']:7d} KB", flush=True)
+    return results
+
+STARTUP_TARGET_MS = 200
+
+def measure_startup(iterations, cwd):
+    """Launch the GUI with ``--startup-time`` and collect its time to interactive (needs a display)."""
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    samples = []
+    for _ in range(iterations):
+        result = subprocess.run([sys.executable, main_py, "--startup-time"], cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0 or not result.stdout.strip():
+            raise RuntimeError(f"GUI startup failed: {result.stderr.strip()}")
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    stats = {"p50_ms": percentile(samples, 0.5), "p95_ms": percentile(samples, 0.95), "max_ms": max(samples)}
+    flag = "  over target" if stats["p50_ms"] > STARTUP_TARGET_MS else ""
+    print(f"{'startup (interactive)':28} p50 {stats['p50_ms']:9.1f} ms  p95 {stats['p95_ms']:9.1f} ms  "
+          f"max {stats['max_ms']:9.1f} ms  target {STARTUP_TARGET_MS} ms{flag}", flush=True)
+    return stats
+
+def compare(results, baseline, threshold):
+    """Print p50 changes against a baseline; return the names that regressed beyond ``threshold``."""
+    regressions = []
+    print(f"\n{'operation':28} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, now in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:28} {'-':>10} {now['p50_ms']:10.1f}      new")
+            continue
+        change = (now["p50_ms"] - before["p50_ms"]) / before["p50_ms"] if before["p50_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:28} {before['p50_ms']:10.1f} {now['p50_ms']:10.1f} {change:+7.0%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--big-diff-lines", type=int, default=20000)
+    parser.add_argument("--branches", type=int, default=200)
+    parser.add_argument("--stashes", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--workdir", help="where to build the repositories (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic repositories")
+    parser.add_argument("--git", help="path to the git executable")
+    parser.add_argument("--startup", action="store_true", help="also time GUI startup (needs a display)")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown before failing (default 0.2)")
+    args = parser.parse_args(argv)
+
+    os.environ.update(IDENTITY)
+    git_path = args.git or find_git_executable()
+    root = tempfile.mkdtemp(prefix="gitpushgui_bench_", dir=args.workdir)
+    try:
+        started = time.perf_counter()
+        work, _ = build_repo(git_path, root, args.commits, args.files, args.big_diff_lines,
+                             args.branches, args.stashes)
+        print(f"Built synthetic repo in {time.perf_counter() - started:.1f}s: {args.commits} commits, "
+              f"{args.files} files, {args.branches} branches, {args.stashes} stashes, "
+              f"{args.big_diff_lines}-line diff ({root})\n", flush=True)
+        operations, executor, backend = make_operations(git_path, work)
+        try:
+            results = measure(operations, args.iterations, args.warmup)
+        finally:
+            executor.shutdown()
+            backend.close_all()
+        if args.startup:
+            try:
+                results["startup (interactive)"] = measure_startup(args.iterations, root)
+            except RuntimeError as e:
+                print(f"startup not measured: {e.args[0].splitlines()[-1]}")
+        report = {
+            "config": {k: getattr(args, k) for k in ("commits", "files", "big_diff_lines", "branches", "stashes", "iterations")},
+            "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                            "git": git(git_path, root, "version").decode().strip()},
+            "child_peak_rss_kb": child_maxrss_kb(),
+            "results": results,
+        }
+        if report["child_peak_rss_kb"] is not None:
+            print(f"\npeak RSS of git child processes: {report['child_peak_rss_kb']} KB")
+        if args.save_baseline:
+            with open(args.save_baseline, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved baseline to {args.save_baseline}")
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline.get("config") != report["config"]:
+                print("warning: baseline was recorded with a different configuration")
+            if compare(results, baseline, args.threshold):
+                return 1
+        return 0
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
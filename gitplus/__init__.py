@@ -0,0 +1,10 @@
+"""Headless core of Git Push Helper. Nothing in this package imports tkinter."""
+from .results import GitError, GitResult, Commit, GitInfo, RepoInfo, WorkspaceResult
+from .executor import GitJob, GitExecutor
+from .backend import GitBackend, CatFileBatch, find_git_dir, read_head
+from .watch import RepoState
+from .history import CommitIndex, iter_log
+from .status import StatusEntry, StatusSnapshot, parse_porcelain_v2, read_status
+from .discovery import discover_git
+from .core import (GitRepository, find_git_executable, load_settings, save_settings,
+                   run_git, run_workspace, write_default_gitignore)
@@ -0,0 +1,187 @@
+"""Repository metadata read without porcelain git spawns."""
+import os
+import subprocess
+import threading
+
+from .executor import CREATE_NO_WINDOW
+
+def find_git_dir(path):
+    """Return the git directory for ``path`` (walking up), or None."""
+    path = os.path.abspath(path)
+    while True:
+        dotgit = os.path.join(path, ".git")
+        if os.path.isdir(dotgit):
+            return dotgit
+        if os.path.isfile(dotgit):
+            try:
+                with open(dotgit, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, line[7:].strip()))
+            return None
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def read_head(git_dir):
+    """Return ``(branch, detached_oid)`` from HEAD without running git."""
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None, None
+    if head.startswith("ref:"):
+        ref = head[4:].strip()
+        if ref.startswith("refs/heads/"):
+            ref = ref[len("refs/heads/"):]
+        return ref, None
+    return "HEAD", head
+
+def common_git_dir(git_dir):
+    """Return the directory holding refs and config (differs for linked worktrees)."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+def read_ref(common_dir, ref):
+    """Resolve a full ref name from loose refs or packed-refs without running git."""
+    try:
+        with open(os.path.join(common_dir, *ref.split("/")), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith(f" {ref}\n") or line.rstrip("\n").endswith(f" {ref}"):
+                    return line.split(" ", 1)[0]
+    except OSError:
+        pass
+    return None
+
+class CatFileBatch:
+    """Long-lived ``git cat-file --batch-check`` process for one repository.
+
+    Resolving any number of revisions costs one write and one read on the
+    already running process instead of a ``git rev-parse`` spawn each.
+    """
+    def __init__(self, git_path, repo_path):
+        self.git_path = git_path
+        self.repo_path = repo_path
+        self.lock = threading.Lock()
+        self.process = None
+
+    def _start(self):
+        self.process = subprocess.Popen([self.git_path, "cat-file", "--batch-check"],
+                                        cwd=self.repo_path, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        text=True, encoding="utf-8", errors="replace",
+                                        bufsize=1, creationflags=CREATE_NO_WINDOW)
+
+    def resolve(self, *names):
+        """Return ``{name: (oid, type)}``; unknown names map to None."""
+        names = [n for n in names if n and "\n" not in n]
+        if not names:
+            return {}
+        with self.lock:
+            for attempt in range(2):
+                if self.process is None or self.process.poll() is not None:
+                    self._start()
+                try:
+                    self.process.stdin.write("".join(n + "\n" for n in names))
+                    self.process.stdin.flush()
+                    lines = [self.process.stdout.readline() for _ in names]
+                except (OSError, ValueError):
+                    lines = []
+                if len(lines) == len(names) and all(lines):
+                    break
+                self.close()
+            else:
+                raise OSError("git cat-file helper exited unexpectedly")
+        resolved = {}
+        for name, line in zip(names, lines):
+            parts = line.split()
+            if len(parts) == 3 and parts[1] not in ("missing", "ambiguous"):
+                resolved[name] = (parts[0], parts[1])
+            else:
+                resolved[name] = None
+        return resolved
+
+    def close(self):
+        proc, self.process = self.process, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=2)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            proc.kill()
+        for stream in (proc.stdout, proc.stderr):
+            if stream:
+                stream.close()
+
+class GitBackend:
+    """Metadata queries for repositories, served without porcelain spawns.
+
+    HEAD is read straight from the git directory, remotes come from one
+    ``git config`` call, and object lookups go through a pooled
+    ``CatFileBatch`` helper kept open per repository.
+    """
+    def __init__(self, git_path, max_helpers=8):
+        self.git_path = git_path
+        self.max_helpers = max_helpers
+        self.lock = threading.Lock()
+        self.helpers = {}
+
+    def helper(self, repo_path):
+        key = os.path.abspath(repo_path)
+        with self.lock:
+            helper = self.helpers.pop(key, None)
+            if helper is None:
+                helper = CatFileBatch(self.git_path, key)
+            self.helpers[key] = helper
+            evicted = []
+            while len(self.helpers) > self.max_helpers:
+                evicted.append(self.helpers.pop(next(iter(self.helpers))))
+        for old in evicted:
+            old.close()
+        return helper
+
+    def resolve(self, repo_path, *names):
+        return self.helper(repo_path).resolve(*names)
+
+    def remotes(self, repo_path):
+        """Return ``{remote_name: url}`` from a single ``git config`` call."""
+        result = subprocess.run([self.git_path, "config", "-z", "--get-regexp", r"^remote\..*\.url$"],
+                                cwd=repo_path, capture_output=True, text=True,
+                                encoding="utf-8", errors="replace", creationflags=CREATE_NO_WINDOW)
+        remotes = {}
+        for entry in result.stdout.split("\0"):
+            key, _, url = entry.partition("\n")
+            if key.startswith("remote.") and key.endswith(".url"):
+                remotes.setdefault(key[len("remote."):-len(".url")], url)
+        return remotes
+
+    def probe(self, repo_path):
+        """Everything ``browse_repository`` needs in one round trip."""
+        git_dir = find_git_dir(repo_path)
+        if git_dir is None:
+            return {"git_dir": None, "branch": None, "head": None, "remotes": {}}
+        branch, head = read_head(git_dir)
+        if head is None:
+            found = self.resolve(repo_path, "HEAD").get("HEAD")
+            head = found[0] if found else None
+        return {"git_dir": git_dir, "branch": branch, "head": head,
+                "remotes": self.remotes(repo_path)}
+
+    def close_all(self):
+        with self.lock:
+            helpers = list(self.helpers.values())
+            self.helpers.clear()
+        for helper in helpers:
+            helper.close()
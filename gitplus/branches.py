@@ -0,0 +1,125 @@
+"""Branch listing with ahead/behind counts from a single for-each-ref, and a fuzzy filter over it."""
+import subprocess
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitError
+
+FIELDS = ("%(HEAD)", "%(refname)", "%(refname:short)", "%(objectname)", "%(upstream:short)",
+          "%(upstream:track,nobracket)", "%(committerdate:unix)", "%(contents:subject)")
+
+class Branch:
+    __slots__ = ("name", "ref", "remote", "oid", "upstream", "ahead", "behind", "gone", "date", "subject", "current",
+                 "head_ahead", "head_behind")
+
+    def __init__(self, name, ref, oid, upstream=None, ahead=None, behind=None, gone=False, date=0, subject="", current=False,
+                 head_ahead=None, head_behind=None):
+        self.name = name
+        self.ref = ref
+        self.remote = ref.startswith("refs/remotes/")
+        self.oid = oid
+        self.upstream = upstream
+        self.ahead = ahead
+        self.behind = behind
+        self.gone = gone
+        self.date = date
+        self.subject = subject
+        self.current = current
+        self.head_ahead = head_ahead
+        self.head_behind = head_behind
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def parse_track(text):
+    """``ahead 2, behind 1`` -> ``(2, 1, False)``; ``gone`` -> ``(None, None, True)``."""
+    if text == "gone":
+        return None, None, True
+    ahead = behind = 0
+    for part in text.split(", "):
+        word, _, count = part.partition(" ")
+        if word == "ahead":
+            ahead = int(count)
+        elif word == "behind":
+            behind = int(count)
+    return ahead, behind, False
+
+def parse_branches(data, ahead_behind=False):
+    branches = []
+    for line in data.split("\n"):
+        if not line:
+            continue
+        fields = line.split("\0")
+        if len(fields) < len(FIELDS) or fields[1].endswith("/HEAD"):
+            continue
+        current, ref, name, oid, upstream, track, date, subject = fields[:8]
+        ahead, behind, gone = parse_track(track) if upstream else (None, None, False)
+        head_ahead = head_behind = None
+        if ahead_behind and len(fields) > 8 and fields[8]:
+            head_ahead, head_behind = (int(n) for n in fields[8].split())
+        branches.append(Branch(name, ref, oid, upstream or None, ahead, behind, gone,
+                               int(date or 0), subject, current == "*", head_ahead, head_behind))
+    return branches
+
+def read_branches(git_path, repo_path, ahead_behind=False):
+    """List local and remote-tracking branches, newest first, in one ``git for-each-ref``.
+
+    ``ahead``/``behind`` are always against each branch's upstream, from
+    ``%(upstream:track)``. With ``ahead_behind`` (git 2.41+) the same call
+    also fills ``head_ahead``/``head_behind`` against HEAD; pass it only
+    when HEAD points at a commit, since the atom fails on an unborn branch.
+    """
+    fmt = "%00".join(FIELDS + (("%(ahead-behind:HEAD)",) if ahead_behind else ()))
+    cmd = [git_path, "for-each-ref", "--sort=-committerdate", f"--format={fmt}", "refs/heads", "refs/remotes"]
+    result = subprocess.run(cmd, cwd=repo_path, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", creationflags=CREATE_NO_WINDOW)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git for-each-ref exited with code {result.returncode}")
+    return parse_branches(result.stdout, ahead_behind)
+
+class BranchIndex:
+    """Lower-cased branch names prepared once, filtered incrementally as the query grows."""
+    def __init__(self, branches):
+        self.branches = branches
+        self.keys = [b.name.lower() for b in branches]
+        self.last_query = ""
+        self.last_matches = list(range(len(branches)))
+
+    def filter(self, query, limit=None):
+        """Return ``(branches, total)`` matching ``query`` as a subsequence, best matches first."""
+        query = query.lower()
+        if self.last_query and query.startswith(self.last_query):
+            candidates = self.last_matches
+        else:
+            candidates = range(len(self.keys))
+        keys = self.keys
+        if not query:
+            matches = list(candidates)
+            ranked = matches
+        else:
+            scored = []
+            for i in candidates:
+                score = fuzzy_score(query, keys[i])
+                if score is not None:
+                    scored.append((score, i))
+            matches = [i for _, i in scored]
+            scored.sort()
+            ranked = [i for _, i in scored]
+        self.last_query = query
+        self.last_matches = matches
+        shown = ranked if limit is None else ranked[:limit]
+        return [self.branches[i] for i in shown], len(ranked)
+
+def fuzzy_score(query, key):
+    """Lower is better; None when ``query`` is not a subsequence of ``key``."""
+    pos = key.find(query)
+    if pos >= 0:
+        return (0, pos != 0 and key[pos - 1] not in "/-_", len(key))
+    start = -1
+    first = None
+    for ch in query:
+        start = key.find(ch, start + 1)
+        if start < 0:
+            return None
+        if first is None:
+            first = start
+    return (1, start - first, len(key))
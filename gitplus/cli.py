@@ -0,0 +1,159 @@
+"""Command-line entry point: ``python -m gitplus``."""
+import argparse
+import json
+import os
+import sys
+
+from .discovery import discover_git
+from .core import GitRepository, load_settings, run_workspace, WORKSPACE_COMMANDS
+from .results import GitError, GitResult
+from .scan import FileScanner
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gitplus", description="Git Push Helper without the GUI.")
+    parser.add_argument("-C", "--repo", help="repository path (default: the current directory)")
+    parser.add_argument("--last-repo", action="store_true", help="use the repository the GUI last opened")
+    parser.add_argument("--git", help="path to the git executable")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("info", help="branch, HEAD and remotes")
+    sub.add_parser("git", help="git path, version and supported features (cached)")
+    sub.add_parser("status", help="porcelain v2 status summary")
+    sub.add_parser("init", help="initialize a repository with a basic .gitignore")
+    commit = sub.add_parser("commit", help="add all changes (or only the given paths) and commit")
+    commit.add_argument("-m", "--message", required=True)
+    commit.add_argument("paths", nargs="*", help="stage just these paths in one batch before committing")
+    stage = sub.add_parser("stage", help="stage paths in one batched index update")
+    stage.add_argument("paths", nargs="+")
+    unstage = sub.add_parser("unstage", help="unstage paths in one batch")
+    unstage.add_argument("paths", nargs="+")
+    push = sub.add_parser("push", help="push a branch to origin")
+    push.add_argument("--branch")
+    push.add_argument("--remote-url", help="set or add origin to this URL first")
+    sub.add_parser("pull")
+    sub.add_parser("fetch")
+    log = sub.add_parser("log", help="recent commits")
+    log.add_argument("-n", "--limit", type=int, default=10)
+    branch = sub.add_parser("branch", help="list, create, switch or delete branches")
+    branch.add_argument("action", choices=("list", "create", "switch", "delete"))
+    branch.add_argument("name", nargs="?")
+    stash = sub.add_parser("stash")
+    stash.add_argument("action", nargs="?", choices=("push", "pop", "apply", "drop", "list"), default="push")
+    stash.add_argument("index", nargs="?", type=int, help="stash@{N} for pop, apply and drop (default 0)")
+    sub.add_parser("diff")
+    sub.add_parser("untracked")
+    scan = sub.add_parser("scan", help="flag large or binary untracked and modified files before staging")
+    scan.add_argument("--max-mb", type=int, help="size limit in MiB (default: GUI setting or 25)")
+    scan.add_argument("--binary-kb", type=int, help="flag binary files from this size in KiB (default: GUI setting or 1024)")
+    scan.add_argument("--all", action="store_true", help="list every scanned file with its size, not only flagged ones")
+    sub.add_parser("remotes")
+    workspace = sub.add_parser("workspace", help="run an operation across many repositories")
+    workspace.add_argument("operation", choices=("status",) + tuple(WORKSPACE_COMMANDS))
+    workspace.add_argument("repos", nargs="*", help="default: the GUI workspace list")
+    workspace.add_argument("-j", "--jobs", type=int, help="parallel operations (default: GUI setting or 4)")
+    return parser
+
+# One letter per status section for plain-text output; git's own "U" would read as unmerged.
+SECTION_CODES = {"Conflicts": "C", "Staged": "S", "Unstaged": "M", "Untracked": "?"}
+
+def emit(value, as_json):
+    """Print a result and return the process exit code."""
+    items = value if isinstance(value, list) else [value]
+    ok = all(getattr(item, "ok", True) for item in items)
+    if as_json:
+        if isinstance(value, list):
+            data = [item.to_dict() if hasattr(item, "to_dict") else item for item in value]
+        else:
+            data = value.to_dict() if hasattr(value, "to_dict") else value
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0 if ok else 1
+    for item in items:
+        if isinstance(item, GitResult):
+            sys.stdout.write(item.stdout)
+            sys.stderr.write(item.stderr)
+        elif hasattr(item, "summary"):
+            sys.stdout.write(item.summary())
+            for section, entries in item.sections().items():
+                for entry in entries:
+                    sys.stdout.write(f"{SECTION_CODES.get(section, section[0])} {entry.xy} {entry.path}\n")
+        elif hasattr(item, "upstream") and hasattr(item, "ref"):
+            track = f"+{item.ahead}/-{item.behind}" if item.ahead is not None else ("gone" if item.gone else "")
+            sys.stdout.write(f"{'*' if item.current else ' '} {item.name:40} {track:12} {item.subject}\n")
+        elif hasattr(item, "stat") and hasattr(item, "ref"):
+            sys.stdout.write(f"{item.ref:12} {item.message}  ({item.stat or ''})\n")
+        elif hasattr(item, "reason") and hasattr(item, "size"):
+            sys.stdout.write(f"{item.size:>12}  {item.reason or '':6}  {item.path}\n")
+        elif hasattr(item, "subject"):
+            sys.stdout.write(f"{item.hash[:7]} | {item.author} | {item.date} | {item.subject}\n")
+        elif hasattr(item, "operation"):
+            mark = "ok" if item.ok else "FAILED"
+            sys.stdout.write(f"{mark:6} {item.elapsed:6.2f}s  {item.repo}  {item.detail}\n")
+        elif isinstance(item, dict):
+            for key, val in item.items():
+                sys.stdout.write(f"{key}\t{val}\n")
+        elif hasattr(item, "to_dict"):
+            for key, val in item.to_dict().items():
+                sys.stdout.write(f"{key}: {val}\n")
+        else:
+            sys.stdout.write(f"{item}\n")
+    return 0 if ok else 1
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = load_settings()
+    if args.command == "workspace":
+        repos = args.repos or settings.get("workspace", [])
+        jobs = args.jobs or settings.get("workspace_concurrency", 4)
+        return emit(run_workspace(repos, args.operation, args.git, max(1, jobs)), args.json)
+    if args.last_repo and not args.repo and not settings.get("repo_path"):
+        sys.stderr.write("error: the GUI has not opened a repository yet\n")
+        return 1
+    repo_path = args.repo or (settings["repo_path"] if args.last_repo else os.getcwd())
+    repo = GitRepository(os.path.abspath(repo_path), args.git)
+    try:
+        if args.command == "info":
+            value = repo.info()
+        elif args.command == "git":
+            value = discover_git()
+        elif args.command == "status":
+            value = repo.status()
+        elif args.command == "init":
+            value = repo.init()
+        elif args.command == "commit":
+            value = repo.commit_paths(args.message, args.paths) if args.paths else repo.commit_all(args.message)
+        elif args.command in ("stage", "unstage"):
+            value = getattr(repo, args.command)(args.paths)
+        elif args.command == "push":
+            value = repo.push(args.branch, args.remote_url)
+        elif args.command == "log":
+            value = repo.history(args.limit)
+        elif args.command == "branch" and args.action == "list":
+            value = repo.branches()
+        elif args.command == "branch":
+            if not args.name:
+                raise GitError(f"branch {args.action} needs a branch name")
+            value = {"create": repo.create_branch, "switch": repo.switch_branch,
+                     "delete": repo.delete_branch}[args.action](args.name)
+        elif args.command == "scan":
+            scanner = FileScanner(max_bytes=(args.max_mb or settings.get("large_file_mb", 25)) * 1024 * 1024,
+                                  binary_bytes=(args.binary_kb or settings.get("binary_file_kb", 1024)) * 1024)
+            files = scanner.scan(repo.git_path, repo.path)
+            value = files if args.all else sorted((f for f in files if f.reason), key=lambda f: -f.size)
+        elif args.command == "stash":
+            if args.action in ("apply", "drop") or (args.action == "pop" and args.index is not None):
+                value = repo.stash_action(args.action, args.index or 0)
+            else:
+                value = {"push": repo.stash, "pop": repo.stash_pop, "list": repo.stash_list}[args.action]()
+        else:
+            value = getattr(repo, args.command)()
+        return emit(value, args.json)
+    except (GitError, OSError) as e:
+        if args.json:
+            json.dump({"ok": False, "error": str(e)}, sys.stdout)
+            sys.stdout.write("\n")
+        else:
+            sys.stderr.write(f"error: {e}\n")
+        return 1
+    finally:
+        repo.close()
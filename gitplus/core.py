@@ -0,0 +1,320 @@
+"""Git operations shared by the GUI and the command line. Never imports tkinter."""
+import os
+import subprocess
+import time
+
+from .executor import CREATE_NO_WINDOW, GitExecutor
+from .backend import GitBackend, find_git_dir, common_git_dir, read_ref
+from .history import iter_log
+from .status import read_status
+from .results import GitResult, GitError, Commit, RepoInfo, WorkspaceResult
+from .diff import ZERO_OID
+from .discovery import discover_git
+from .settings import load_settings, save_settings
+from .branches import read_branches
+from .stash import ACTIONS as STASH_ACTIONS, read_stashes, read_stash_stats
+
+DEFAULT_GITIGNORE = "# Python\n__pycache__/\n*.pyc\n*.pyo\n\n# IDE\n.vscode/\n.idea/\n\n# OS\n.DS_Store\nThumbs.db\n"
+
+WORKSPACE_COMMANDS = {
+    "fetch": ['fetch', '--prune'],
+    "pull": ['pull'],
+    "push": ['push'],
+}
+
+def find_git_executable():
+    """Path of the git executable, from the discovery cache when it is still valid."""
+    return discover_git().path
+
+def write_default_gitignore(repo_path):
+    with open(os.path.join(repo_path, '.gitignore'), 'w') as f:
+        f.write(DEFAULT_GITIGNORE)
+
+def run_git(git_path, args, cwd, input=None):
+    """Run ``git <args>`` in ``cwd`` and return a GitResult."""
+    command = [git_path] + list(args)
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(command, cwd=cwd or None, input=input, capture_output=True,
+                                text=True, encoding="utf-8", errors="replace",
+                                creationflags=CREATE_NO_WINDOW)
+    except OSError as e:
+        return GitResult(command, -1, "", f"{e}\n", time.perf_counter() - started)
+    return GitResult(command, result.returncode, result.stdout, result.stderr,
+                     time.perf_counter() - started)
+
+def commit_commands(message):
+    return [['add', '.'], ['commit', '-m', message]]
+
+def stage_commands(paths=(), patch="", message=None, unstage=False):
+    """Batched index updates for a selection as ``(args, stdin)`` pairs.
+
+    All ``paths`` go through one ``update-index --stdin`` and all selected
+    hunks through one ``apply --cached``, so the cost does not grow with a
+    process per path. With ``message`` the commit is appended to the same
+    sequence. ``unstage`` only applies to the patch; see unstage_commands.
+    ``paths`` must name files; expand_paths resolves directories.
+    """
+    commands = []
+    if paths:
+        commands.append((['update-index', '--add', '--remove', '-z', '--stdin'], "\0".join(paths) + "\0"))
+    if patch:
+        commands.append((['apply', '--cached', '--whitespace=nowarn'] + (['--reverse'] if unstage else []) + ['-'], patch))
+    if message:
+        commands.append((['commit', '-F', '-'], message))
+    return commands
+
+def expand_paths(git_path, repo_path, paths):
+    """``paths`` with every directory, and every path missing from the worktree, replaced by the changed files under it.
+
+    ``update-index`` only takes files: it skips ``dir/``, rejects ``dir`` and
+    quietly ignores paths it does not know. Just those entries go through one
+    ``ls-files``, which lists the untracked, modified and deleted files they
+    cover. Raises GitError when nothing is left to stage.
+    """
+    def is_file(path):
+        full = os.path.join(repo_path, path)
+        return not path.endswith("/") and os.path.lexists(full) and (os.path.islink(full) or not os.path.isdir(full))
+
+    files = [path for path in paths if is_file(path)]
+    specs = [path for path in paths if not is_file(path)]
+    if specs:
+        listed = run_git(git_path, ['--literal-pathspecs', 'ls-files', '-z', '--others', '--modified',
+                                    '--exclude-standard', '--'] + specs, repo_path)
+        if not listed.ok:
+            raise GitError(listed.stderr.strip() or f"git ls-files exited with code {listed.returncode}")
+        files.extend(path for path in listed.stdout.split("\0") if path)
+    if not files:
+        raise GitError(f"Nothing to stage in {', '.join(paths)}")
+    return list(dict.fromkeys(files))
+
+def unstage_commands(git_path, repo_path, paths=(), patch=""):
+    """Commands that reset ``paths`` (and reverse ``patch``) in the index back to HEAD.
+
+    One ``diff-index --cached`` lists what is staged; the HEAD entries for
+    the chosen paths are then written back with a single ``update-index
+    --index-info``. Unlike ``git reset -- <paths>`` this does not match every
+    path against thousands of pathspecs.
+    """
+    commands = []
+    if paths:
+        staged = run_git(git_path, ['diff-index', '--cached', '-z', '--no-renames', 'HEAD'], repo_path)
+        head = {}
+        if staged.ok:
+            tokens = staged.stdout.split("\0")
+            for i in range(0, len(tokens) - 1, 2):
+                fields = tokens[i][1:].split(" ")
+                head[tokens[i + 1]] = (fields[0], fields[2])
+            paths = [path for path in paths if path in head]
+        # Without a HEAD (unborn branch) every staged path is new and is simply dropped from the index.
+        lines = []
+        for path in paths:
+            mode, oid = head.get(path, ("000000", ZERO_OID))
+            lines.append(f"{int(mode, 8):o} {oid}\t{path}")
+        if lines:
+            commands.append((['update-index', '-z', '--index-info'], "\0".join(lines) + "\0"))
+    if patch:
+        commands.extend(stage_commands(patch=patch, unstage=True))
+    return commands
+
+def run_staged(git_path, repo_path, commands):
+    """Run ``stage_commands`` output in order, stopping after the first failure."""
+    results = []
+    for args, data in commands:
+        results.append(run_git(git_path, args, repo_path, input=data))
+        if not results[-1].ok:
+            break
+    return results
+
+def remote_commands(remotes, remote_url):
+    """Commands that point origin at ``remote_url``; empty when it already does."""
+    if remotes.get("origin") == remote_url:
+        return []
+    if "origin" in remotes:
+        return [['remote', 'set-url', 'origin', remote_url]]
+    return [['remote', 'add', 'origin', remote_url]]
+
+def push_command(branch, progress=False):
+    return ['push'] + (['--progress'] if progress else []) + ['-u', 'origin', branch]
+
+def transfer_command(operation, progress=False):
+    """``pull`` or ``fetch`` (the workspace variant), optionally with ``--progress``."""
+    command = list(WORKSPACE_COMMANDS[operation])
+    if progress:
+        command.insert(1, '--progress')
+    return command
+
+def push_is_noop(repo_path, branch, remote="origin"):
+    """True when the local branch tip equals the cached remote-tracking ref, so a push has nothing to send."""
+    git_dir = find_git_dir(repo_path)
+    if git_dir is None or not branch:
+        return False
+    common_dir = common_git_dir(git_dir)
+    local = read_ref(common_dir, f"refs/heads/{branch}")
+    return local is not None and local == read_ref(common_dir, f"refs/remotes/{remote}/{branch}")
+
+def run_stash_action(git_path, repo_path, action, stash):
+    """``git stash <action> stash@{n}`` after checking that the entry still is ``stash.oid``.
+
+    Entries are addressed by position, so a stash made or dropped elsewhere
+    would otherwise make this act on a different entry than the one shown.
+    """
+    if action not in STASH_ACTIONS:
+        raise ValueError(f"unknown stash action: {action}")
+    current = run_git(git_path, ["rev-parse", "-q", "--verify", stash.ref], repo_path)
+    if current.stdout.strip() != stash.oid:
+        raise GitError(f"{stash.ref} is no longer {stash.oid[:7]}; the stash list changed, refresh it")
+    return run_git(git_path, ["stash", action, stash.ref], repo_path)
+
+class GitRepository:
+    """Blocking, UI-free operations on one repository."""
+    def __init__(self, path, git_path=None, backend=None):
+        self.path = path
+        self.git_path = git_path or find_git_executable()
+        self.backend = backend or GitBackend(self.git_path)
+
+    def run(self, *args):
+        return run_git(self.git_path, args, self.path)
+
+    def run_all(self, commands):
+        """Run commands in order, stopping after the first failure."""
+        results = []
+        for args in commands:
+            results.append(self.run(*args))
+            if not results[-1].ok:
+                break
+        return results
+
+    def info(self):
+        probe = self.backend.probe(self.path)
+        return RepoInfo(self.path, probe["git_dir"], probe["branch"], probe["head"], probe["remotes"])
+
+    def status(self):
+        return read_status(self.git_path, self.path)
+
+    def init(self, write_gitignore=True):
+        result = self.run('init')
+        if result.ok and write_gitignore:
+            write_default_gitignore(self.path)
+        return result
+
+    def commit_all(self, message):
+        return self.run_all(commit_commands(message))
+
+    def stage(self, paths):
+        return run_staged(self.git_path, self.path, stage_commands(expand_paths(self.git_path, self.path, paths)))
+
+    def unstage(self, paths):
+        return run_staged(self.git_path, self.path, unstage_commands(self.git_path, self.path, paths))
+
+    def commit_paths(self, message, paths):
+        """Stage exactly ``paths`` and commit them together with whatever is already staged."""
+        paths = expand_paths(self.git_path, self.path, paths)
+        return run_staged(self.git_path, self.path, stage_commands(paths, message=message))
+
+    def push(self, branch=None, remote_url=None):
+        branch = branch or self.info().branch
+        if not branch or branch == "HEAD":
+            raise GitError("Cannot push: no branch is checked out")
+        commands = []
+        if remote_url:
+            commands.extend(remote_commands(self.backend.remotes(self.path), remote_url))
+        results = self.run_all(commands)
+        if results and not results[-1].ok:
+            return results
+        # After a set-url or add the cached origin/<branch> belongs to the old remote, so only skip when origin is unchanged.
+        if not commands and push_is_noop(self.path, branch):
+            results.append(GitResult([self.git_path] + push_command(branch), 0, "",
+                                     f"Everything up-to-date (origin/{branch} already at the local tip; push skipped)\n"))
+            return results
+        results.append(self.run(*push_command(branch)))
+        return results
+
+    def pull(self):
+        return self.run('pull')
+
+    def fetch(self):
+        return self.run(*WORKSPACE_COMMANDS["fetch"])
+
+    def history(self, limit=10):
+        if self.info().head is None:
+            return []
+        return [Commit(*fields) for fields in iter_log(self.git_path, self.path, [f"-n{int(limit)}", "HEAD"])]
+
+    def branches(self):
+        ahead_behind = discover_git().features.get("ahead_behind", False) and self.info().head is not None
+        return read_branches(self.git_path, self.path, ahead_behind)
+
+    def create_branch(self, name):
+        return self.run('checkout', '-b', name)
+
+    def switch_branch(self, name):
+        return self.run('checkout', name)
+
+    def delete_branch(self, name):
+        return self.run('branch', '-d', name)
+
+    def stash(self):
+        return self.run('stash')
+
+    def stash_pop(self):
+        return self.run('stash', 'pop')
+
+    def stash_list(self):
+        """Stash entries with their stat summaries, from one ``stash list`` and one ``diff-tree``."""
+        stashes = read_stashes(self.git_path, self.path)
+        stats = read_stash_stats(self.git_path, self.path, stashes)
+        for stash in stashes:
+            stash.stat = stats.get(stash.oid)
+        return stashes
+
+    def stash_action(self, action, index=0):
+        """Apply, pop or drop ``stash@{index}``."""
+        stashes = read_stashes(self.git_path, self.path)
+        if not 0 <= index < len(stashes):
+            raise GitError(f"No stash entry stash@{{{index}}}")
+        return run_stash_action(self.git_path, self.path, action, stashes[index])
+
+    def diff(self):
+        return self.run('diff')
+
+    def untracked(self):
+        return [entry.path for entry in self.status().sections()["Untracked"]]
+
+    def remotes(self):
+        return self.backend.remotes(self.path)
+
+    def close(self):
+        self.backend.close_all()
+
+def run_workspace(repos, operation, git_path=None, jobs=4):
+    """Run one operation across ``repos`` on a bounded pool; returns WorkspaceResults in input order."""
+    git_path = git_path or find_git_executable()
+    executor = GitExecutor(workers=jobs)
+    try:
+        submitted = []
+        for repo in repos:
+            if operation == "status":
+                job, _ = executor.submit_call("status", lambda repo=repo: read_status(git_path, repo), repo, key=())
+            else:
+                job, _ = executor.submit([git_path] + WORKSPACE_COMMANDS[operation], repo, quiet=True)
+            submitted.append(job)
+        # Identical read-only jobs merge, so wait for each distinct job once and share its result.
+        remaining = {id(job) for job in submitted}
+        while remaining:
+            kind, job, _ = executor.events.get()
+            if kind == "done":
+                remaining.discard(id(job))
+    finally:
+        executor.shutdown()
+    results = []
+    for repo, job in zip(repos, submitted):
+        if operation == "status":
+            detail = " | ".join(job.result.summary().strip().splitlines()) if job.ok else job.error_output.strip()
+            git_results = []
+        else:
+            lines = (job.output + job.error_output).strip().splitlines()
+            detail = lines[-1] if lines else ""
+            git_results = [GitResult(job.command, job.returncode, job.output, job.error_output, job.elapsed or 0.0)]
+        results.append(WorkspaceResult(repo, operation, job.ok, job.elapsed or 0.0, detail, git_results))
+    return results
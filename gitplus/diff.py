@@ -0,0 +1,160 @@
+"""Stat-first diff loading and a memory-bounded cache of per-file diffs."""
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitError
+
+ZERO_OID = "0" * 40
+
+class DiffFile:
+    __slots__ = ("path", "orig", "status", "added", "deleted", "src_oid", "dst_oid")
+
+    def __init__(self, path, orig=None, status="M", added=0, deleted=0, src_oid=None, dst_oid=None):
+        self.path = path
+        self.orig = orig
+        self.status = status
+        self.added = added
+        self.deleted = deleted
+        self.src_oid = src_oid
+        self.dst_oid = dst_oid
+
+    @property
+    def binary(self):
+        return self.added is None
+
+    def cache_key(self, repo_path):
+        """Identify this diff by blob ids, plus the file's stat when it is only in the worktree."""
+        worktree = None
+        if not self.dst_oid or self.dst_oid.strip("0") == "":
+            try:
+                st = os.stat(os.path.join(repo_path, self.path))
+                worktree = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                worktree = None
+        return (repo_path, self.path, self.orig, self.src_oid, self.dst_oid, worktree)
+
+def parse_raw_numstat(data):
+    """Parse ``git diff --raw --numstat -z`` output into DiffFile objects."""
+    tokens = data.split("\0")
+    files = {}
+    order = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+        if token.startswith(":"):
+            fields = token[1:].split(" ")
+            status = fields[4]
+            if status[:1] in ("R", "C"):
+                orig, path = tokens[i], tokens[i + 1]
+                i += 2
+            else:
+                orig, path = None, tokens[i]
+                i += 1
+            files[path] = DiffFile(path, orig, status[:1], 0, 0, fields[2], fields[3])
+            order.append(path)
+        else:
+            added, deleted, path = token.split("\t", 2)
+            if not path:
+                path = tokens[i + 1]
+                i += 2
+            entry = files.get(path)
+            if entry is None:
+                entry = files[path] = DiffFile(path)
+                order.append(path)
+            if added == "-":
+                entry.added = entry.deleted = None
+            else:
+                entry.added = int(added)
+                entry.deleted = int(deleted)
+    return [files[path] for path in order]
+
+def read_diff_files(git_path, repo_path, staged=False):
+    cmd = [git_path, "diff", "--raw", "--numstat", "-z", "--no-abbrev"]
+    if staged:
+        cmd.append("--cached")
+    result = subprocess.run(cmd, cwd=repo_path, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", creationflags=CREATE_NO_WINDOW)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git diff exited with code {result.returncode}")
+    return parse_raw_numstat(result.stdout)
+
+def read_file_diff(git_path, repo_path, diff_file, limit, staged=False):
+    """Return ``(text, truncated)`` holding at most ``limit`` bytes of one file's patch."""
+    cmd = [git_path, "diff", "--no-color"]
+    if staged:
+        cmd.append("--cached")
+    cmd.append("--")
+    if diff_file.orig:
+        cmd.append(diff_file.orig)
+    cmd.append(diff_file.path)
+    return read_limited(cmd, repo_path, limit)
+
+def read_limited(cmd, repo_path, limit):
+    """Run ``cmd`` and return ``(text, truncated)`` holding at most ``limit`` bytes of its output.
+
+    The process is killed as soon as the limit is reached, so a huge patch
+    costs no more than the part that is shown.
+    """
+    proc = subprocess.Popen(cmd, cwd=repo_path, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, creationflags=CREATE_NO_WINDOW)
+    try:
+        data = proc.stdout.read(limit + 1)
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    truncated = len(data) > limit
+    if truncated:
+        data = data[:limit]
+        data = data[:data.rfind(b"\n") + 1] or data
+    return data.decode("utf-8", "replace"), truncated
+
+def split_hunks(patch):
+    """Split one file's patch into ``(header, [hunk, ...])`` at its ``@@`` lines."""
+    header = []
+    hunks = []
+    for line in patch.splitlines(keepends=True):
+        if line.startswith("@@"):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    return "".join(header), ["".join(hunk) for hunk in hunks]
+
+class DiffCache:
+    """LRU cache of rendered diffs bounded by total size in bytes."""
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store ``(text, truncated, limit)`` and evict the least recently used entries."""
+        cost = len(value[0])
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            if cost > self.max_bytes:
+                return
+            self.entries[key] = value
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted[0])
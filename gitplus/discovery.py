@@ -0,0 +1,94 @@
+"""Locating the git executable and probing what it supports, cached between runs."""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from .appdirs import user_cache_dir
+from .executor import CREATE_NO_WINDOW
+from .results import GitInfo
+
+CACHE_VERSION = 2
+
+WINDOWS_PATHS = [
+    r"C:\Program Files\Git\bin\git.exe",
+    r"C:\Program Files (x86)\Git\bin\git.exe",
+    r"C:\Users\{}\AppData\Local\Programs\Git\bin\git.exe".format(os.getenv('USERNAME')),
+]
+
+def locate_git():
+    """Find git on PATH, then in the usual Windows install locations, without a shell."""
+    git_exe = shutil.which("git")
+    if git_exe:
+        return git_exe
+    if os.name == "nt":
+        for path in WINDOWS_PATHS:
+            if os.path.exists(path):
+                return path
+    return "git"
+
+def parse_version(text):
+    """``git version 2.45.1.windows.1`` -> ``(2, 45, 1)``."""
+    numbers = []
+    for part in text.strip().rsplit(" ", 1)[-1].split("."):
+        if not part.isdigit():
+            break
+        numbers.append(int(part))
+    return tuple(numbers)
+
+def features_for(version):
+    return {
+        "fsmonitor": version >= (2, 36) and (os.name == "nt" or sys.platform == "darwin"),
+        "ahead_behind": version >= (2, 41),
+    }
+
+def probe_git(git_path):
+    """Run ``git version`` once and derive the feature flags from it."""
+    try:
+        result = subprocess.run([git_path, "version"], capture_output=True, text=True,
+                                creationflags=CREATE_NO_WINDOW)
+        output = result.stdout if result.returncode == 0 else ""
+    except OSError:
+        output = ""
+    version = parse_version(output) if output else ()
+    return GitInfo(git_path, ".".join(map(str, version)), features_for(version))
+
+def stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def path_digest():
+    return hashlib.sha1(os.environ.get("PATH", "").encode("utf-8", "replace")).hexdigest()[:12]
+
+def discover_git(cache_path=None):
+    """Return GitInfo for the git to use.
+
+    The result is cached in the user cache directory and reused while PATH
+    is unchanged and the binary's mtime and size still match, so a normal
+    start costs one ``stat`` instead of a search and a ``git version`` run.
+    """
+    cache_path = cache_path or os.path.join(user_cache_dir(), "git.json")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if (cached.get("cache_version") == CACHE_VERSION and cached.get("path_digest") == path_digest()
+                and cached.get("stat") is not None and stat_key(cached["path"]) == cached["stat"]):
+            return GitInfo(cached["path"], cached["version"], cached["features"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    info = probe_git(locate_git())
+    key = stat_key(info.path)
+    if key is not None and info.version:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"cache_version": CACHE_VERSION, "path_digest": path_digest(), "stat": key,
+                           "path": info.path, "version": info.version, "features": info.features}, f)
+        except OSError:
+            pass
+    return info
@@ -0,0 +1,235 @@
+"""Background execution of git commands."""
+import os
+import subprocess
+import threading
+import queue
+import time
+
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+class GitJob:
+    def __init__(self, command, cwd, read_only=False, quiet=False, func=None):
+        self.command = command
+        self.cwd = cwd
+        self.read_only = read_only
+        self.quiet = quiet
+        self.func = func
+        self.result = None
+        self.callbacks = []
+        self.stdout = []
+        self.stderr = []
+        self.returncode = None
+        self.seq = 0
+        self.started = None
+        self.finished = None
+        self.spawn_latency = None
+        self.stdout_bytes = 0
+        self.stderr_bytes = 0
+        self.cancelled = False
+        self.process = None
+        self.progress = None
+
+    @property
+    def key(self):
+        return (self.cwd, tuple(self.command))
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.cancelled
+
+    @property
+    def output(self):
+        return "".join(self.stdout)
+
+    @property
+    def elapsed(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def error_output(self):
+        return "".join(self.stderr)
+
+class GitExecutor:
+    """Runs git commands on background threads, one at a time by default.
+
+    Output is streamed line by line into ``events``; the GUI drains it with
+    ``root.after`` so no Tk call ever happens off the main thread. Identical
+    read-only commands that are already queued or running are merged.
+    ``workers`` bounds how many commands run concurrently; an optional
+    PerfRecorder receives one record per finished job.
+    """
+    def __init__(self, workers=1, recorder=None):
+        self.recorder = recorder
+        self.jobs = queue.Queue()
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.running = set()
+        self.outstanding = 0
+        self.submitted = 0
+        self.cancelled_upto = 0
+        self.workers = []
+        for _ in range(max(1, workers)):
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def submit(self, command, cwd, callback=None, read_only=False, quiet=False, func=None):
+        """Queue a command. Returns ``(job, merged)``."""
+        job = GitJob(list(command), cwd, read_only, quiet, func)
+        with self.lock:
+            existing = self.pending.get(job.key) if read_only else None
+            if existing is not None and not existing.cancelled:
+                if callback:
+                    existing.callbacks.append(callback)
+                return existing, True
+            if callback:
+                job.callbacks.append(callback)
+            if read_only:
+                self.pending[job.key] = job
+            self.submitted += 1
+            self.outstanding += 1
+            job.seq = self.submitted
+        self.jobs.put(job)
+        return job, False
+
+    def submit_call(self, name, func, cwd, callback=None, key=None):
+        """Queue ``func()`` as a quiet job; its return value lands in ``job.result``.
+
+        ``name`` only labels the job. Calls are merged only when the caller
+        passes ``key``, a tuple that must identify the work (``func`` and
+        everything it reads): a queued or running call with the same name,
+        key and ``cwd`` then serves both callbacks.
+        """
+        if key is None:
+            return self.submit([name], cwd, callback, quiet=True, func=func)
+        return self.submit([name] + [str(part) for part in key], cwd, callback, read_only=True, quiet=True, func=func)
+
+    def busy(self):
+        return self.outstanding > 0
+
+    def cancel(self):
+        """Drop everything queued and terminate the running commands."""
+        with self.lock:
+            self.cancelled_upto = self.submitted
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            job.cancelled = True
+            self._finish(job)
+        with self.lock:
+            for job in self.running:
+                job.cancelled = True
+                if job.process and job.process.poll() is None:
+                    try:
+                        job.process.terminate()
+                    except OSError:
+                        pass
+
+    def shutdown(self):
+        """Cancel outstanding work and let the worker threads exit."""
+        self.cancel()
+        for _ in self.workers:
+            self.jobs.put(None)
+
+    def _finish(self, job):
+        with self.lock:
+            self.outstanding -= 1
+            if self.pending.get(job.key) is job:
+                del self.pending[job.key]
+        self.events.put(("done", job, None))
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            with self.lock:
+                if job.seq <= self.cancelled_upto:
+                    job.cancelled = True
+                else:
+                    self.running.add(job)
+            if job.cancelled:
+                self._finish(job)
+                continue
+            job.started = time.perf_counter()
+            try:
+                self._run(job)
+            finally:
+                job.finished = time.perf_counter()
+                with self.lock:
+                    self.running.discard(job)
+                if self.recorder is not None:
+                    self._record(job)
+                self._finish(job)
+
+    def _record(self, job):
+        if job.func is not None:
+            self.recorder.record("call", job.command[0], job.started, job.elapsed,
+                                 cwd=job.cwd, exit=job.returncode)
+            return
+        name = " ".join([os.path.splitext(os.path.basename(job.command[0]))[0]] + job.command[1:2])
+        self.recorder.record("command", name, job.started, job.elapsed, args=job.command, cwd=job.cwd,
+                             exit=job.returncode, spawn=job.spawn_latency, cancelled=job.cancelled,
+                             stdout_bytes=job.stdout_bytes, stderr_bytes=job.stderr_bytes)
+
+    def _run(self, job):
+        if job.func is not None:
+            try:
+                job.result = job.func()
+                job.returncode = 0
+            except Exception as e:
+                job.stderr.append(f"{e}\n")
+                job.returncode = -1
+            return
+        spawn_started = time.perf_counter()
+        try:
+            proc = subprocess.Popen(job.command, cwd=job.cwd or None,
+                                    stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, encoding="utf-8", errors="replace",
+                                    bufsize=1, creationflags=CREATE_NO_WINDOW)
+        except OSError as e:
+            job.stderr.append(f"{e}\n")
+            job.returncode = -1
+            if not job.quiet:
+                self.events.put(("stderr", job, f"{e}\n"))
+            return
+        job.spawn_latency = time.perf_counter() - spawn_started
+        with self.lock:
+            job.process = proc
+            if job.cancelled:
+                proc.terminate()
+
+        def pump_stderr():
+            for line in proc.stderr:
+                job.stderr.append(line)
+                job.stderr_bytes += len(line.encode("utf-8", "replace"))
+                if not job.quiet:
+                    self.events.put(("stderr", job, line))
+
+        err_thread = threading.Thread(target=pump_stderr, daemon=True)
+        err_thread.start()
+        for line in proc.stdout:
+            job.stdout.append(line)
+            job.stdout_bytes += len(line.encode("utf-8", "replace"))
+            if not job.quiet:
+                self.events.put(("stdout", job, line))
+        proc.wait()
+        err_thread.join()
+        proc.stdout.close()
+        proc.stderr.close()
+        job.returncode = proc.returncode
+
+    def poll(self):
+        """Return every event queued so far without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
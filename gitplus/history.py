@@ -0,0 +1,158 @@
+"""Streaming git log parser and the on-disk commit index."""
+import os
+import subprocess
+import tempfile
+import threading
+import hashlib
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitError
+
+def iter_log(git_path, repo_path, revs, chunk_size=65536):
+    """Stream ``(hash, author, date, subject)`` tuples from ``git log -z``.
+
+    Raises GitError with git's message once the output is exhausted if
+    ``git log`` failed, so a truncated log is never taken as complete.
+    """
+    cmd = [git_path, "log", "-z", "--date=short", "--format=%H%x1f%an%x1f%ad%x1f%s"] + list(revs) + ["--"]
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, cwd=repo_path, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=errors,
+                            creationflags=CREATE_NO_WINDOW)
+    try:
+        rest = b""
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            records = (rest + chunk).split(b"\0")
+            rest = records.pop()
+            for record in records:
+                fields = record.decode("utf-8", "replace").split("\x1f", 3)
+                if len(fields) == 4:
+                    yield tuple(fields)
+        if rest:
+            fields = rest.decode("utf-8", "replace").split("\x1f", 3)
+            if len(fields) == 4:
+                yield tuple(fields)
+        if proc.wait() != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", "replace").strip()
+            raise GitError(message or f"git log exited with code {proc.returncode}")
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        errors.close()
+
+class CommitIndex:
+    """Compact on-disk index of one branch's history, newest commit first.
+
+    The file is append-only: each update writes a ``#batch <tip>`` block of
+    new commits closed by ``#end``; incomplete blocks are ignored on load.
+    A failed ``git log`` leaves its block open, so it is discarded as well.
+    """
+    def __init__(self, git_path, repo_path, path):
+        self.git_path = git_path
+        self.repo_path = repo_path
+        self.path = path
+        self.lock = threading.Lock()
+        self.commits = []
+        self.tip = None
+        self.building = False
+        self.loaded = False
+
+    @classmethod
+    def for_branch(cls, git_path, repo_path, common_dir, branch):
+        digest = hashlib.sha1((branch or "HEAD").encode("utf-8")).hexdigest()[:12]
+        return cls(git_path, repo_path, os.path.join(common_dir, "gitpushgui", f"history-{digest}.idx"))
+
+    def load(self):
+        batches = []
+        tip = None
+        try:
+            with open(self.path, "r", encoding="utf-8", newline="\n") as f:
+                current = None
+                for line in f:
+                    line = line.rstrip("\n")
+                    if line.startswith("#batch "):
+                        current = (line[7:], [])
+                    elif line == "#end" and current is not None:
+                        batches.append(current[1])
+                        tip = current[0]
+                        current = None
+                    elif current is not None:
+                        fields = line.split("\x1f", 3)
+                        if len(fields) == 4:
+                            current[1].append(tuple(fields))
+        except OSError:
+            pass
+        commits = []
+        for batch in reversed(batches):
+            commits.extend(batch)
+        with self.lock:
+            self.commits = commits
+            self.tip = tip
+            self.loaded = True
+
+    def _is_ancestor(self, old, new):
+        result = subprocess.run([self.git_path, "merge-base", "--is-ancestor", old, new],
+                                cwd=self.repo_path, capture_output=True, creationflags=CREATE_NO_WINDOW)
+        return result.returncode == 0
+
+    def update(self, tip):
+        """Bring the index up to ``tip``. Returns the number of new commits."""
+        if not self.loaded:
+            self.load()
+        if not tip or tip == self.tip:
+            return 0
+        incremental = self.tip is not None and self._is_ancestor(self.tip, tip)
+        revs = [tip, "^" + self.tip] if incremental else [tip]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fresh = []
+        with self.lock:
+            self.building = True
+            if not incremental:
+                self.commits = fresh
+        # A rebuild goes to a side file so a failed log cannot wipe the existing index.
+        target = self.path if incremental else self.path + ".tmp"
+        try:
+            with open(target, "a" if incremental else "w", encoding="utf-8", newline="\n") as f:
+                f.write(f"#batch {tip}\n")
+                for commit in iter_log(self.git_path, self.repo_path, revs):
+                    f.write("\x1f".join(commit) + "\n")
+                    with self.lock:
+                        fresh.append(commit)
+                f.write("#end\n")
+            if not incremental:
+                os.replace(target, self.path)
+            with self.lock:
+                if incremental:
+                    self.commits = fresh + self.commits
+                self.tip = tip
+        except GitError:
+            # Back to what the file holds without the unfinished batch.
+            if not incremental and os.path.exists(target):
+                os.remove(target)
+            self.load()
+            raise
+        finally:
+            with self.lock:
+                self.building = False
+        return len(fresh)
+
+    def count(self):
+        with self.lock:
+            return len(self.commits)
+
+    def page(self, start, size):
+        with self.lock:
+            return self.commits[start:start + size]
+
+    def search(self, text, field="subject"):
+        column = {"hash": 0, "author": 1, "date": 2, "subject": 3}[field]
+        text = text.lower()
+        with self.lock:
+            commits = self.commits
+        return [c for c in commits if text in c[column].lower()]
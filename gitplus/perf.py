@@ -0,0 +1,88 @@
+"""Timing records for commands, rendering and UI stalls, exportable as JSON or Chrome trace."""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class PerfRecorder:
+    """Thread-safe ring buffer of timing records.
+
+    Every record has ``kind``, ``name``, ``start`` and ``duration`` (seconds,
+    relative to when the recorder was created) plus kind-specific fields.
+    """
+    def __init__(self, max_records=5000, stall_threshold=0.2):
+        self.origin = time.perf_counter()
+        self.records = deque(maxlen=max_records)
+        self.total = 0
+        self.lock = threading.Lock()
+        self.stall_threshold = stall_threshold
+        self.last_beat = None
+
+    def record(self, kind, name, start, duration, **fields):
+        entry = {"kind": kind, "name": name, "start": start - self.origin,
+                 "duration": duration, "thread": threading.current_thread().name}
+        entry.update(fields)
+        with self.lock:
+            self.records.append(entry)
+            self.total += 1
+        return entry
+
+    def heartbeat(self, interval):
+        """Call from the UI loop every ``interval`` seconds; records a stall when a beat comes late."""
+        now = time.perf_counter()
+        last, self.last_beat = self.last_beat, now
+        if last is None:
+            return None
+        late = now - last - interval
+        if late > self.stall_threshold:
+            return self.record("stall", "main loop", last + interval, late)
+        return None
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+    def since(self, total):
+        """Return ``(records added after the recorder had seen total records, new total)``."""
+        with self.lock:
+            new = min(max(self.total - total, 0), len(self.records))
+            return list(self.records)[len(self.records) - new:], self.total
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self.total = 0
+
+    def summary(self):
+        """Return ``{(kind, name): {"count", "p50", "p95", "max"}}`` over the recorded durations."""
+        groups = {}
+        for entry in self.snapshot():
+            groups.setdefault((entry["kind"], entry["name"]), []).append(entry["duration"])
+        summary = {}
+        for key, durations in groups.items():
+            durations.sort()
+            summary[key] = {
+                "count": len(durations),
+                "p50": durations[len(durations) // 2],
+                "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+                "max": durations[-1],
+            }
+        return summary
+
+    def to_chrome_trace(self):
+        events = []
+        threads = {}
+        for entry in self.snapshot():
+            tid = threads.setdefault(entry["thread"], len(threads) + 1)
+            args = {k: v for k, v in entry.items() if k not in ("kind", "name", "start", "duration", "thread")}
+            events.append({"name": entry["name"], "cat": entry["kind"], "ph": "X", "pid": os.getpid(),
+                           "tid": tid, "ts": entry["start"] * 1e6, "dur": entry["duration"] * 1e6, "args": args})
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path, chrome_trace=False):
+        data = self.to_chrome_trace() if chrome_trace else {"records": self.snapshot()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
@@ -0,0 +1,70 @@
+"""Typed results returned by the headless API."""
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+class GitError(Exception):
+    """A git command failed; ``result`` holds the failing GitResult when there is one."""
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+@dataclass
+class GitResult:
+    command: List[str]
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def to_dict(self):
+        data = asdict(self)
+        data["ok"] = self.ok
+        return data
+
+@dataclass
+class Commit:
+    hash: str
+    author: str
+    date: str
+    subject: str
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class RepoInfo:
+    path: str
+    git_dir: Optional[str]
+    branch: Optional[str]
+    head: Optional[str]
+    remotes: dict = field(default_factory=dict)
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class GitInfo:
+    path: str
+    version: str
+    features: dict = field(default_factory=dict)
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class WorkspaceResult:
+    repo: str
+    operation: str
+    ok: bool
+    elapsed: float
+    detail: str = ""
+    results: List[GitResult] = field(default_factory=list)
+
+    def to_dict(self):
+        data = asdict(self)
+        data["results"] = [r.to_dict() for r in self.results]
+        return data
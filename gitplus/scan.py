@@ -0,0 +1,149 @@
+"""Size and binary checks for files about to be staged, on a thread pool with a stat-keyed cache."""
+import itertools
+import os
+import re
+import stat
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .executor import CREATE_NO_WINDOW
+
+BINARY_EXTENSIONS = {
+    ".7z", ".a", ".bin", ".bz2", ".class", ".dll", ".dmg", ".dylib", ".exe", ".gz", ".iso", ".jar", ".lib",
+    ".mov", ".mp3", ".mp4", ".msi", ".o", ".obj", ".pdb", ".pyd", ".rar", ".so", ".tar", ".tgz", ".war",
+    ".whl", ".xz", ".zip", ".zst",
+}
+SNIFF_BYTES = 8000
+
+class ScannedFile:
+    __slots__ = ("path", "size", "binary", "reason")
+
+    def __init__(self, path, size, binary=None, reason=None):
+        self.path = path
+        self.size = size
+        self.binary = binary
+        self.reason = reason
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def looks_binary(path):
+    """git's own test: a NUL byte in the first 8000 bytes, or a well-known binary extension."""
+    if os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+        return True
+    try:
+        with open(path, "rb") as f:
+            return b"\0" in f.read(SNIFF_BYTES)
+    except OSError:
+        return False
+
+def iter_ls_files(git_path, repo_path, args):
+    """Yield paths from ``git ls-files -z <args>`` as the output arrives."""
+    proc = subprocess.Popen([git_path, "ls-files", "-z"] + list(args), cwd=repo_path, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, creationflags=CREATE_NO_WINDOW)
+    pending = b""
+    try:
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            *paths, pending = (pending + chunk).split(b"\0")
+            for path in paths:
+                if path:
+                    yield path.decode("utf-8", "surrogateescape")
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+class FileScanner:
+    """Flags files over ``max_bytes``, and binary files over ``binary_bytes``.
+
+    Paths are stat'ed in batches on a thread pool while they are still being
+    listed. Results are cached per path with its mtime and size, so a second
+    scan only reads files that changed since.
+    """
+    BATCH = 256
+
+    def __init__(self, max_bytes=25 * 1024 * 1024, binary_bytes=1024 * 1024, workers=8):
+        self.max_bytes = max_bytes
+        self.binary_bytes = binary_bytes
+        self.workers = workers
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def _inspect_batch(self, repo_path, paths):
+        files = []
+        for path in paths:
+            full = os.path.join(repo_path, path)
+            try:
+                st = os.lstat(full)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            key = (st.st_mtime_ns, st.st_size)
+            with self.lock:
+                cached = self.cache.get(full)
+            if cached is not None and cached[0] == key:
+                binary = cached[1]
+            else:
+                binary = looks_binary(full) if st.st_size >= self.binary_bytes else None
+                with self.lock:
+                    self.cache[full] = (key, binary)
+            if st.st_size > self.max_bytes:
+                reason = "large"
+            elif binary:
+                reason = "binary"
+            else:
+                reason = None
+            files.append(ScannedFile(path, st.st_size, binary, reason))
+        return files
+
+    def inspect(self, repo_path, paths):
+        """ScannedFile for every regular file among ``paths`` (any iterable), in input order."""
+        seen = set()
+        futures = []
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="scan") as pool:
+            unique = (path for path in paths if not (path in seen or seen.add(path)))
+            while True:
+                batch = list(itertools.islice(unique, self.BATCH))
+                if not batch:
+                    break
+                futures.append(pool.submit(self._inspect_batch, repo_path, batch))
+            return [f for future in futures for f in future.result()]
+
+    def findings(self, repo_path, paths):
+        """Only the flagged files among ``paths``, largest first."""
+        return sorted((f for f in self.inspect(repo_path, paths) if f.reason), key=lambda f: -f.size)
+
+    def scan(self, git_path, repo_path, untracked=True, modified=True):
+        """Inspect untracked (not ignored) and modified files, streamed from ``git ls-files``."""
+        sources = []
+        if untracked:
+            sources.append(iter_ls_files(git_path, repo_path, ["--others", "--exclude-standard"]))
+        if modified:
+            sources.append(iter_ls_files(git_path, repo_path, ["--modified"]))
+        return self.inspect(repo_path, itertools.chain(*sources))
+
+def ignore_pattern(path):
+    """A .gitignore line matching exactly ``path`` from the repository root."""
+    pattern = re.sub(r"([\\*?\[#!])", r"\\\1", path.replace(os.sep, "/"))
+    stripped = pattern.rstrip(" ")
+    return "/" + stripped + "\\ " * (len(pattern) - len(stripped))
+
+def append_gitignore(repo_path, paths):
+    """Add patterns for ``paths`` to the root .gitignore; returns the lines that were not already there."""
+    path = os.path.join(repo_path, ".gitignore")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        text = ""
+    existing = set(text.splitlines())
+    lines = [line for line in dict.fromkeys(ignore_pattern(p) for p in paths) if line not in existing]
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            if text and not text.endswith("\n"):
+                f.write("\n")
+            f.write("".join(line + "\n" for line in lines))
+    return lines
@@ -0,0 +1,175 @@
+"""Settings, recent repositories and per-repository snapshots in the user config directory."""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .appdirs import user_config_dir
+from .history import iter_log
+from .status import read_status
+
+LEGACY_SETTINGS_FILE = "gitpushgui_settings.json"
+
+def settings_path():
+    return os.path.join(user_config_dir(), "settings.json")
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_json_atomic(path, data):
+    """Write ``data`` to a temporary file next to ``path`` and rename it into place."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def load_settings(path=None):
+    """Read the settings file, falling back once to the old file in the working directory."""
+    for candidate in ([path] if path else [settings_path(), LEGACY_SETTINGS_FILE]):
+        data = read_json(candidate)
+        if isinstance(data, dict):
+            return data
+    return {}
+
+def save_settings(data, path=None):
+    try:
+        write_json_atomic(path or settings_path(), data)
+    except OSError:
+        pass
+
+def repo_snapshot(git_path, backend, repo_path, history=50):
+    """Collect what the main window shows for a repository: branch, remotes, status summary and recent commits."""
+    probe = backend.probe(repo_path)
+    snapshot = {"branch": probe["branch"], "head": probe["head"], "remotes": probe["remotes"],
+                "status": None, "counts": {}, "history": [], "saved": time.time()}
+    if probe["git_dir"] is None:
+        return snapshot
+    snap = read_status(git_path, repo_path)
+    snapshot["status"] = snap.summary()
+    snapshot["counts"] = {name: len(entries) for name, entries in snap.sections().items()}
+    snapshot["ahead"], snapshot["behind"], snapshot["upstream"] = snap.ahead, snap.behind, snap.upstream
+    if probe["head"]:
+        snapshot["history"] = [list(commit) for commit in iter_log(git_path, repo_path, [f"-n{history}", probe["head"]])]
+    return snapshot
+
+class SettingsStore:
+    """Settings, the most-recently-used repository list and per-repository snapshots.
+
+    Changes are kept in memory and written ``delay`` seconds after the last
+    one; each file is replaced atomically. Snapshots live in one small file
+    per repository under ``repos/`` so saving one never rewrites the others.
+    """
+    MAX_RECENT = 10
+
+    def __init__(self, directory=None, delay=1.0):
+        self.directory = directory or user_config_dir()
+        self.path = os.path.join(self.directory, "settings.json")
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.timer = None
+        self.data = load_settings(self.path if directory else None)
+        self.snapshots = {}
+        self.dirty = set()
+        self.removed = set()
+
+    def snapshot_path(self, repo_path):
+        key = os.path.normcase(os.path.abspath(repo_path))
+        return os.path.join(self.directory, "repos", hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".json")
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+
+    def update(self, **values):
+        values = {k: list(v) if isinstance(v, list) else v for k, v in values.items()}
+        with self.lock:
+            if all(self.data.get(k) == v for k, v in values.items()):
+                return
+            self.data.update(values)
+            self.dirty.add(self.path)
+        self.schedule()
+
+    @property
+    def recent(self):
+        with self.lock:
+            return list(self.data.get("recent", []))
+
+    def add_recent(self, repo_path):
+        """Move ``repo_path`` to the front of the recent list; snapshots of repos that fall off are deleted."""
+        with self.lock:
+            recent = [repo_path] + [p for p in self.data.get("recent", []) if p != repo_path]
+            if recent == self.data.get("recent"):
+                return
+            for dropped in recent[self.MAX_RECENT:]:
+                path = self.snapshot_path(dropped)
+                self.snapshots.pop(path, None)
+                self.dirty.discard(path)
+                self.removed.add(path)
+            self.data["recent"] = recent[:self.MAX_RECENT]
+            self.dirty.add(self.path)
+        self.schedule()
+
+    def snapshot(self, repo_path):
+        path = self.snapshot_path(repo_path)
+        with self.lock:
+            if path in self.snapshots:
+                return self.snapshots[path]
+        data = read_json(path)
+        with self.lock:
+            self.snapshots.setdefault(path, data)
+            return self.snapshots[path]
+
+    def save_snapshot(self, repo_path, snapshot):
+        path = self.snapshot_path(repo_path)
+        with self.lock:
+            self.snapshots[path] = snapshot
+            self.removed.discard(path)
+            self.dirty.add(path)
+        self.schedule()
+
+    def schedule(self):
+        """Restart the debounce timer."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """Write every changed file now."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            writes = [(path, dict(self.data) if path == self.path else self.snapshots.get(path))
+                      for path in self.dirty]
+            removed, self.removed = self.removed, set()
+            self.dirty = set()
+        for path, data in writes:
+            if data is None:
+                continue
+            try:
+                write_json_atomic(path, data)
+            except OSError:
+                pass
+        for path in removed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,83 @@
+"""Stash listing in one ``git stash list``, batched stat summaries and per-entry patches."""
+import subprocess
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitError
+from .diff import read_limited
+
+FORMAT = "%H%x1f%P%x1f%ct%x1f%gs"
+ACTIONS = ("apply", "pop", "drop")
+
+class Stash:
+    __slots__ = ("oid", "index", "parent", "date", "message", "stat")
+
+    def __init__(self, oid, index, parent, date=0, message="", stat=None):
+        self.oid = oid
+        self.index = index
+        self.parent = parent
+        self.date = date
+        self.message = message
+        self.stat = stat
+
+    @property
+    def ref(self):
+        return f"stash@{{{self.index}}}"
+
+    def to_dict(self):
+        return dict({name: getattr(self, name) for name in self.__slots__}, ref=self.ref)
+
+def parse_stashes(data):
+    stashes = []
+    for record in data.split("\0"):
+        fields = record.strip("\n").split("\x1f")
+        if len(fields) < 4:
+            continue
+        oid, parents, date, message = fields[:4]
+        stashes.append(Stash(oid, len(stashes), parents.split(" ")[0], int(date or 0), message))
+    return stashes
+
+def read_stashes(git_path, repo_path):
+    """List stash entries, newest first; stats are left for ``read_stash_stats``."""
+    cmd = [git_path, "stash", "list", "-z", f"--format={FORMAT}"]
+    result = subprocess.run(cmd, cwd=repo_path, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", creationflags=CREATE_NO_WINDOW)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git stash list exited with code {result.returncode}")
+    return parse_stashes(result.stdout)
+
+def read_stash_stats(git_path, repo_path, stashes):
+    """``{oid: "2 files changed, ..."}`` for ``stashes`` from a single ``diff-tree --stdin``.
+
+    Each input line names a stash commit and its base, so git diffs the
+    stashed worktree against the commit it was taken on, like ``stash show``.
+    """
+    stashes = [s for s in stashes if s.parent]
+    if not stashes:
+        return {}
+    cmd = [git_path, "diff-tree", "--stdin", "--shortstat"]
+    data = "".join(f"{s.oid} {s.parent}\n" for s in stashes)
+    result = subprocess.run(cmd, cwd=repo_path, input=data, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", creationflags=CREATE_NO_WINDOW)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git diff-tree exited with code {result.returncode}")
+    stats = {s.oid: "no changes" for s in stashes}
+    current = None
+    for line in result.stdout.splitlines():
+        if line in stats:
+            current = line
+        elif current and line.strip():
+            stats[current] = line.strip()
+    return stats
+
+def read_stash_patch(git_path, repo_path, stash, limit):
+    """Return ``(text, truncated)`` holding at most ``limit`` bytes of one entry's patch."""
+    cmd = [git_path, "diff", "--no-color", stash.parent, stash.oid]
+    return read_limited(cmd, repo_path, limit)
+
+def without_stash(stashes, oid):
+    """The list after ``oid`` was popped or dropped: later entries move up one position."""
+    remaining = []
+    for stash in stashes:
+        if stash.oid != oid:
+            remaining.append(Stash(stash.oid, len(remaining), stash.parent, stash.date, stash.message, stash.stat))
+    return remaining
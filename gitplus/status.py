@@ -0,0 +1,112 @@
+"""Porcelain v2 status parsing."""
+import subprocess
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitError
+
+class StatusEntry:
+    __slots__ = ("kind", "xy", "path", "orig")
+
+    def __init__(self, kind, xy, path, orig=None):
+        self.kind = kind
+        self.xy = xy
+        self.path = path
+        self.orig = orig
+
+    def __eq__(self, other):
+        return (self.kind, self.xy, self.path, self.orig) == (other.kind, other.xy, other.path, other.orig)
+
+    def __hash__(self):
+        return hash((self.kind, self.xy, self.path, self.orig))
+
+class StatusSnapshot:
+    """Parsed ``git status --porcelain=v2 -z --branch`` output."""
+    __slots__ = ("oid", "head", "upstream", "ahead", "behind", "entries")
+
+    def __init__(self):
+        self.oid = None
+        self.head = None
+        self.upstream = None
+        self.ahead = 0
+        self.behind = 0
+        self.entries = []
+
+    def sections(self):
+        """Return ``{section: [entry, ...]}`` for the file tree."""
+        sections = {"Conflicts": [], "Staged": [], "Unstaged": [], "Untracked": []}
+        for entry in self.entries:
+            if entry.kind == "u":
+                sections["Conflicts"].append(entry)
+            elif entry.kind == "?":
+                sections["Untracked"].append(entry)
+            else:
+                if entry.xy[0] != ".":
+                    sections["Staged"].append(entry)
+                if entry.xy[1] != ".":
+                    sections["Unstaged"].append(entry)
+        return sections
+
+    def summary(self):
+        sections = self.sections()
+        head = self.head if self.head != "(detached)" else f"detached at {(self.oid or '')[:7]}"
+        text = f"On branch {head}"
+        if self.upstream:
+            text += f" (tracking {self.upstream}, ahead {self.ahead}, behind {self.behind})"
+        counts = ", ".join(f"{len(v)} {k.lower()}" for k, v in sections.items() if v)
+        return text + "\n" + (counts or "Working tree clean") + "\n"
+
+    def to_dict(self):
+        return {
+            "oid": self.oid, "head": self.head, "upstream": self.upstream,
+            "ahead": self.ahead, "behind": self.behind,
+            "sections": {name: [{"xy": e.xy, "path": e.path, "orig": e.orig} for e in entries]
+                         for name, entries in self.sections().items()},
+        }
+
+def parse_porcelain_v2(data):
+    """Parse NUL-separated porcelain v2 status output into a StatusSnapshot."""
+    snap = StatusSnapshot()
+    records = data.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            key, _, value = record[2:].partition(" ")
+            if key == "branch.oid":
+                snap.oid = None if value == "(initial)" else value
+            elif key == "branch.head":
+                snap.head = value
+            elif key == "branch.upstream":
+                snap.upstream = value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                snap.ahead = int(ahead)
+                snap.behind = -int(behind)
+        elif kind == "1":
+            fields = record.split(" ", 8)
+            snap.entries.append(StatusEntry("1", fields[1], fields[8]))
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            snap.entries.append(StatusEntry("2", fields[1], fields[9], records[i] if i < len(records) else None))
+            i += 1
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            snap.entries.append(StatusEntry("u", fields[1], fields[10]))
+        elif kind in "?!":
+            snap.entries.append(StatusEntry(kind, kind * 2, record[2:]))
+    return snap
+
+def read_status(git_path, repo_path, all_untracked=False):
+    """Run porcelain v2 status; ``all_untracked`` lists files inside untracked directories."""
+    cmd = [git_path, "status", "--porcelain=v2", "-z", "--branch"]
+    if all_untracked:
+        cmd.append("--untracked-files=all")
+    result = subprocess.run(cmd, cwd=repo_path, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", creationflags=CREATE_NO_WINDOW)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git status exited with code {result.returncode}")
+    return parse_porcelain_v2(result.stdout)
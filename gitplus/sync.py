@@ -0,0 +1,122 @@
+"""Background fetch scheduling and ahead/behind counts against the upstream branch."""
+import os
+import subprocess
+import time
+
+from .executor import CREATE_NO_WINDOW
+from .results import GitResult
+from .branches import parse_track
+
+FETCH_TIMEOUT = 120
+
+class FetchScheduler:
+    """Decides when the next background fetch is due.
+
+    The interval halves (down to ``min_interval``) after a fetch that brought
+    new commits and grows by half (up to ``max_interval``) after one that did
+    not. Failures back off exponentially from the current interval. Nothing
+    is due while the user has been inactive for ``idle_after`` seconds; the
+    first check after they come back fetches right away if one was missed.
+    """
+    def __init__(self, interval=300, min_interval=60, max_interval=1800, idle_after=900, clock=time.monotonic):
+        self.clock = clock
+        self.base_interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.idle_after = idle_after
+        self.interval = interval
+        self.failures = 0
+        self.last_activity = clock()
+        self.last_fetch = None
+        self.next_due = clock() + interval
+
+    def touch(self):
+        """Note user or repository activity."""
+        self.last_activity = self.clock()
+
+    def idle(self):
+        return self.clock() - self.last_activity > self.idle_after
+
+    def due(self):
+        return self.clock() >= self.next_due and not self.idle()
+
+    def succeeded(self, changed):
+        now = self.clock()
+        self.failures = 0
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        self.last_fetch = time.time()
+        self.next_due = now + self.interval
+
+    def failed(self):
+        self.failures += 1
+        self.next_due = self.clock() + min(self.max_interval, self.interval * 2 ** self.failures)
+
+    def reset(self, delay=None, fetched=False):
+        """Go back to the configured interval; the next fetch is ``delay`` seconds away (default: one interval).
+
+        ``fetched`` records a fetch made outside the scheduler, such as Fetch or Pull.
+        """
+        self.interval = self.base_interval
+        self.failures = 0
+        if fetched:
+            self.last_fetch = time.time()
+        self.next_due = self.clock() + (self.interval if delay is None else delay)
+
+def remote_refs(git_path, repo_path):
+    result = subprocess.run([git_path, "for-each-ref", "--format=%(objectname) %(refname)", "refs/remotes"],
+                            cwd=repo_path, capture_output=True, text=True, encoding="utf-8", errors="replace",
+                            creationflags=CREATE_NO_WINDOW)
+    return result.stdout if result.returncode == 0 else None
+
+def custom_ssh(git_path, repo_path):
+    """Whether the user chose their own ssh command, which GIT_SSH_COMMAND would override."""
+    if os.environ.get("GIT_SSH_COMMAND") or os.environ.get("GIT_SSH"):
+        return True
+    result = subprocess.run([git_path, "config", "--get", "core.sshCommand"], cwd=repo_path, capture_output=True,
+                            text=True, encoding="utf-8", errors="replace", creationflags=CREATE_NO_WINDOW)
+    return bool(result.stdout.strip())
+
+def background_fetch(git_path, repo_path, timeout=FETCH_TIMEOUT):
+    """``git fetch --prune`` that can never stop to ask for credentials.
+
+    ssh runs in batch mode unless the user configured their own ssh command;
+    that one is left alone and only the timeout bounds a prompt it may wait on.
+    Returns ``(GitResult, changed)`` where ``changed`` tells whether any
+    remote-tracking ref moved.
+    """
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    if not custom_ssh(git_path, repo_path):
+        env["GIT_SSH_COMMAND"] = "ssh -o BatchMode=yes"
+    command = [git_path, "fetch", "--prune", "--quiet"]
+    before = remote_refs(git_path, repo_path)
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(command, cwd=repo_path, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                              encoding="utf-8", errors="replace", env=env, timeout=timeout,
+                              creationflags=CREATE_NO_WINDOW)
+        result = GitResult(command, proc.returncode, proc.stdout, proc.stderr, time.perf_counter() - started)
+    except subprocess.TimeoutExpired:
+        result = GitResult(command, -1, "", f"fetch timed out after {timeout} s\n", time.perf_counter() - started)
+    except OSError as e:
+        result = GitResult(command, -1, "", f"{e}\n", time.perf_counter() - started)
+    return result, result.ok and remote_refs(git_path, repo_path) != before
+
+def read_tracking(git_path, repo_path, branch):
+    """``(upstream, ahead, behind)`` for ``branch`` from one ``for-each-ref``; None without an upstream.
+
+    The counts come from the local remote-tracking ref, so they are as fresh
+    as the last fetch. ``ahead`` and ``behind`` are None when the upstream is gone.
+    """
+    if not branch or branch == "HEAD":
+        return None
+    result = subprocess.run([git_path, "for-each-ref", "--format=%(upstream:short)%00%(upstream:track,nobracket)",
+                             f"refs/heads/{branch}"], cwd=repo_path, capture_output=True, text=True,
+                            encoding="utf-8", errors="replace", creationflags=CREATE_NO_WINDOW)
+    upstream, _, track = result.stdout.strip("\n").partition("\0")
+    if result.returncode != 0 or not upstream:
+        return None
+    ahead, behind, _ = parse_track(track)
+    return upstream, ahead, behind
@@ -0,0 +1,88 @@
+"""Parsing of git's ``--progress`` output for push, pull and fetch."""
+import re
+import time
+
+PROGRESS_RE = re.compile(
+    r"^(?:remote: )?(?P<phase>[A-Za-z][A-Za-z ]*?):\s+(?P<percent>\d+)% \((?P<current>\d+)/(?P<total>\d+)\)"
+    r"(?:, (?P<size>[\d.]+ [KMGT]?i?B))?(?: \| (?P<rate>[\d.]+ [KMGT]?i?B/s))?(?P<done>, done\.?)?")
+COUNT_RE = re.compile(r"^(?:remote: )?(?P<phase>[A-Za-z][A-Za-z ]*?):\s+(?P<current>\d+)(?P<done>, done\.?)?\s*$")
+
+UNITS = {"B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3, "TiB": 1024 ** 4,
+         "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3, "TB": 1000 ** 4}
+
+def parse_size(text):
+    """Turn git's ``1.20 MiB`` into a byte count."""
+    if not text:
+        return None
+    number, _, unit = text.partition(" ")
+    return int(float(number) * UNITS.get(unit.replace("/s", ""), 1))
+
+class TransferProgress:
+    """Tracks the current phase, object counts, bytes and throughput of a transfer."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phase = ""
+        self.percent = 0
+        self.current = 0
+        self.total = 0
+        self.bytes = None
+        self.rate = None
+        self.transferred = 0
+        self.completed = []
+
+    def feed(self, line):
+        """Consume a stderr line. Returns None if it is not progress, "done" when a phase finishes, else "progress"."""
+        line = line.strip()
+        match = PROGRESS_RE.match(line) or COUNT_RE.match(line)
+        if not match:
+            return None
+        if match.group("phase") != self.phase:
+            self.bytes = None
+            self.rate = None
+        if match.re is PROGRESS_RE:
+            self.phase = match.group("phase")
+            self.percent = int(match.group("percent"))
+            self.current = int(match.group("current"))
+            self.total = int(match.group("total"))
+            if match.group("size"):
+                self.bytes = parse_size(match.group("size"))
+                # bytes reset with each phase; keep the largest count for the summary
+                self.transferred = max(self.transferred, self.bytes)
+            if match.group("rate"):
+                self.rate = parse_size(match.group("rate"))
+        else:
+            self.phase = match.group("phase")
+            self.current = int(match.group("current"))
+            self.percent = 0
+            self.total = 0
+        if match.group("done"):
+            self.completed.append(line)
+            return "done"
+        return "progress"
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def describe(self):
+        parts = [f"{self.phase}: {self.current}/{self.total} objects" if self.total else f"{self.phase}: {self.current}"]
+        if self.bytes is not None:
+            parts.append(format_bytes(self.bytes))
+        if self.rate is not None:
+            parts.append(f"{format_bytes(self.rate)}/s")
+        elif self.bytes and self.elapsed > 0:
+            parts.append(f"~{format_bytes(self.bytes / self.elapsed)}/s")
+        return ", ".join(parts)
+
+    def summary(self):
+        """One line for the end of a transfer: phases, total bytes and average throughput."""
+        text = f"{len(self.completed)} phases in {self.elapsed:.1f}s"
+        if self.transferred:
+            text += f", {format_bytes(self.transferred)} at {format_bytes(self.transferred / max(self.elapsed, 1e-6))}/s"
+        return text
+
+def format_bytes(count):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if count < 1024 or unit == "GiB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.2f} {unit}"
+        count /= 1024
@@ -0,0 +1,244 @@
+"""Repository state cache invalidated by watching the git directory."""
+import os
+import sys
+import threading
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from .backend import find_git_dir, common_git_dir, read_head, read_ref
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCHED_FILES = {"HEAD": "HEAD", "index": "index", "packed-refs": "refs", "config": "config"}
+
+class PollingWatcher:
+    """Reports which parts of a git directory changed by comparing mtimes."""
+    def __init__(self, git_dir, common_dir, callback, interval=1.0):
+        self.paths = {
+            "HEAD": os.path.join(git_dir, "HEAD"),
+            "index": os.path.join(git_dir, "index"),
+            "packed-refs": os.path.join(common_dir, "packed-refs"),
+            "config": os.path.join(common_dir, "config"),
+        }
+        self.refs_dir = os.path.join(common_dir, "refs")
+        self.callback = callback
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def snapshot(self):
+        snap = {WATCHED_FILES[name]: self._stat(path) for name, path in self.paths.items() if name != "packed-refs"}
+        refs = [("packed-refs", self._stat(self.paths["packed-refs"]))]
+        for root, dirs, files in os.walk(self.refs_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                refs.append((path, self._stat(path)))
+        snap["refs"] = hash(tuple(sorted(refs)))
+        return snap
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        last = self.snapshot()
+        while not self.stopped.wait(self.interval):
+            current = self.snapshot()
+            changed = {key for key in current if current[key] != last.get(key)}
+            last = current
+            if changed:
+                self.callback(changed)
+
+    def stop(self):
+        self.stopped.set()
+
+class InotifyWatcher:
+    """Linux watcher for HEAD, index, config and every refs directory."""
+    def __init__(self, git_dir, common_dir, callback, debounce=0.1):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.libc = libc
+        self.fd = fd
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.callback = callback
+        self.debounce = debounce
+        self.watches = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        self.mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+        self._add(git_dir, "git")
+        if common_dir != git_dir:
+            self._add(common_dir, "git")
+        refs_dir = os.path.join(common_dir, "refs")
+        for root, dirs, files in os.walk(refs_dir):
+            self._add(root, "refs")
+
+    def _add(self, path, kind):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask)
+        if wd >= 0:
+            self.watches[wd] = (path, kind)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, cookie, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].split(b"\0", 1)[0].decode("utf-8", "replace")
+            offset += 16 + length
+            path, kind = self.watches.get(wd, (None, None))
+            if kind == "refs":
+                changed.add("refs")
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # git can create several levels at once (refs/heads/team/a for team/a/b) before
+                    # the first watch lands, so watch the whole new subtree.
+                    for root, dirs, files in os.walk(os.path.join(path, name)):
+                        self._add(root, "refs")
+            elif kind == "git" and name in WATCHED_FILES:
+                changed.add(WATCHED_FILES[name])
+        return changed
+
+    def _run(self):
+        while not self.stopped.is_set():
+            ready, _, _ = select.select([self.fd], [], [], 0.5)
+            if not ready:
+                continue
+            changed = self._read()
+            # git rewrites files via lock + rename; let a burst settle
+            while not self.stopped.wait(self.debounce):
+                more = self._read()
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                self.callback(changed)
+        os.close(self.fd)
+
+    def stop(self):
+        self.stopped.set()
+
+def make_watcher(git_dir, common_dir, callback):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(git_dir, common_dir, callback)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(git_dir, common_dir, callback)
+
+class RepoState:
+    """Cached state of one repository, invalidated by watching its git directory.
+
+    Values are loaded on first ``get`` and kept until a watched file they
+    depend on changes. Each invalidation bumps the key's generation; a value
+    loaded while its generation moved is returned but not cached. Change
+    notifications are queued for the Tk thread.
+    """
+    INVALIDATES = {
+        "HEAD": ("branch", "head", "status", "branches"),
+        "index": ("status",),
+        "refs": ("head", "status", "branches", "stashes"),
+        "config": ("remotes", "branches"),
+    }
+
+    def __init__(self, repo_path, backend):
+        self.repo_path = repo_path
+        self.backend = backend
+        self.git_dir = find_git_dir(repo_path)
+        self.common_dir = common_git_dir(self.git_dir) if self.git_dir else None
+        self.lock = threading.Lock()
+        self.values = {}
+        self.generations = {}
+        self.changes = queue.Queue()
+        self.watcher = None
+
+    def start(self):
+        if self.git_dir and self.watcher is None:
+            self.watcher = make_watcher(self.git_dir, self.common_dir, self.invalidate)
+            self.watcher.start()
+
+    def stop(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def invalidate(self, categories):
+        with self.lock:
+            for category in categories:
+                for key in self.INVALIDATES.get(category, ()):
+                    self.values.pop(key, None)
+                    self.generations[key] = self.generations.get(key, 0) + 1
+        self.changes.put(set(categories))
+
+    def poll_changes(self):
+        changed = set()
+        while True:
+            try:
+                changed |= self.changes.get_nowait()
+            except queue.Empty:
+                return changed
+
+    def generation(self, key):
+        """Pass to ``set`` when the value is computed elsewhere, so a stale result is not cached."""
+        with self.lock:
+            return self.generations.get(key, 0)
+
+    def set(self, key, value, generation=None):
+        with self.lock:
+            if generation is None or self.generations.get(key, 0) == generation:
+                self.values[key] = value
+
+    def cached(self, key, default=None):
+        with self.lock:
+            return self.values.get(key, default)
+
+    def get(self, key):
+        with self.lock:
+            if key in self.values:
+                return self.values[key]
+            generation = self.generations.get(key, 0)
+        value = self._load(key)
+        self.set(key, value, generation)
+        return value
+
+    def _load(self, key):
+        if key in ("branch", "head"):
+            if not self.git_dir:
+                return None
+            branch, oid = read_head(self.git_dir)
+            if key == "branch":
+                return branch
+            if oid is None and branch:
+                oid = read_ref(self.common_dir, f"refs/heads/{branch}")
+            return oid
+        if key == "remotes":
+            return self.backend.remotes(self.repo_path)
+        return None
@@ -1,10 +1,29 @@
+import time
+STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import subprocess
 import os
-import threading
-import shutil
-import json
+import sys
+import tempfile
+
+from gitplus.executor import GitExecutor
+from gitplus.backend import GitBackend, find_git_dir, read_head, read_ref
+from gitplus.watch import RepoState
+from gitplus.history import CommitIndex
+from gitplus.status import read_status
+from gitplus.diff import DiffCache, DiffFile, read_diff_files, read_file_diff, split_hunks
+from gitplus.perf import PerfRecorder
+from gitplus.transfer import TransferProgress, format_bytes
+from gitplus.discovery import discover_git
+from gitplus.settings import SettingsStore, repo_snapshot
+from gitplus.branches import BranchIndex, read_branches
+from gitplus.scan import FileScanner, append_gitignore
+from gitplus.stash import read_stashes, read_stash_stats, read_stash_patch, without_stash
+from gitplus.sync import FetchScheduler, background_fetch, read_tracking
+from gitplus.core import (WORKSPACE_COMMANDS, write_default_gitignore, remote_commands, push_command, push_is_noop,
+                          transfer_command, stage_commands, unstage_commands, run_staged, run_stash_action)
 
 class ToolTip:
     def __init__(self, widget, text):
@@ -32,68 +51,1809 @@ class ToolTip:
         if tw:
             tw.destroy()
 
+class OutputConsole:
+    """Ring-buffered front end for the read-only output ``Text`` widget.
+
+    Appends are buffered and written with a single ``insert`` per frame.
+    Once the widget holds more than ``max_lines`` lines the oldest ones are
+    moved to a temporary spill file, so insert and scroll cost stay flat.
+    """
+    def __init__(self, text, max_lines=5000, flush_ms=16, on_flush=None, recorder=None):
+        self.text = text
+        self.recorder = recorder
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self.on_flush = on_flush
+        self.pending = []
+        self.pending_lines = 0
+        self.line_count = 1
+        self.flush_id = None
+        self.spill_path = None
+        self.spilled_lines = 0
+
+    def append(self, message, tag):
+        if self.pending and self.pending[-1][1] == tag:
+            self.pending[-1][0].append(message)
+        else:
+            self.pending.append(([message], tag))
+        self.pending_lines += message.count("\n")
+        if self.flush_id is None:
+            self.flush_id = self.text.after(self.flush_ms, self.flush)
+
+    def flush(self):
+        self.flush_id = None
+        if not self.pending:
+            return
+        started = time.perf_counter()
+        chunks = [("".join(parts), tag) for parts, tag in self.pending]
+        self.pending = []
+        added = self.pending_lines
+        self.pending_lines = 0
+        if added > self.max_lines:
+            chunks = self._spill_chunks(chunks, added - self.max_lines)
+            added = self.max_lines
+        args = []
+        for chunk, tag in chunks:
+            args.extend((chunk, tag))
+        self.text.config(state="normal")
+        self.text.insert(tk.END, *args)
+        self.line_count += added
+        excess = self.line_count - self.max_lines
+        if excess > 0:
+            self._spill(self.text.get("1.0", f"{excess + 1}.0"), excess)
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.line_count -= excess
+        self.text.see(tk.END)
+        self.text.config(state="disabled")
+        if self.recorder is not None:
+            self.recorder.record("render", "console flush", started, time.perf_counter() - started,
+                                 lines=added, chars=sum(len(chunk) for chunk, _ in chunks), trimmed=max(excess, 0))
+        if self.on_flush:
+            self.on_flush(chunks)
+
+    def _spill_chunks(self, chunks, drop):
+        """Spill the first ``drop`` lines of a batch without inserting them."""
+        kept = []
+        spilled = []
+        for chunk, tag in chunks:
+            if drop <= 0:
+                kept.append((chunk, tag))
+                continue
+            lines = chunk.count("\n")
+            if lines <= drop:
+                spilled.append(chunk)
+                drop -= lines
+                continue
+            cut = 0
+            for _ in range(drop):
+                cut = chunk.index("\n", cut) + 1
+            spilled.append(chunk[:cut])
+            kept.append((chunk[cut:], tag))
+            drop = 0
+        text = "".join(spilled)
+        self._spill(text, text.count("\n"))
+        return kept
+
+    def _spill(self, text, lines):
+        try:
+            if self.spill_path is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix="gitpushgui_output_", suffix=".log")
+                os.close(fd)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(text)
+            self.spilled_lines += lines
+        except OSError:
+            pass
+
+    def clear(self):
+        if self.flush_id is not None:
+            self.text.after_cancel(self.flush_id)
+            self.flush_id = None
+        self.pending = []
+        self.pending_lines = 0
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.config(state="disabled")
+        self.line_count = 1
+
+    def open_spill(self):
+        """Open the spill file with the system viewer. Returns False if nothing was spilled."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return False
+        if os.name == "nt":
+            os.startfile(self.spill_path)
+        else:
+            opener = "open" if sys.platform == "darwin" else "xdg-open"
+            subprocess.Popen([opener, self.spill_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+
+    def close(self):
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+
+class HistoryWindow:
+    """Commit history browser that inserts Treeview rows a page at a time."""
+    PAGE = 200
+
+    def __init__(self, app, index, title, preview=None):
+        self.app = app
+        self.index = index
+        self.preview = preview if preview and not index.commits else None
+        self.source = None
+        self.shown = 0
+        self.search_id = None
+        self.done = False
+        self.win = tk.Toplevel(app.root)
+        self.win.title(title)
+        self.win.geometry("850x500")
+        self.win.configure(bg="#2b2b2b")
+        top = tk.Frame(self.win, bg="#2b2b2b")
+        top.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Label(top, text="Search:", fg="white", bg="#2b2b2b", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(top, textvariable=self.search_var, font=("Arial", 10), bg="#404040", fg="white", insertbackground="white")
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind("<KeyRelease>", self.schedule_search)
+        self.field_var = tk.StringVar(value="subject")
+        field = ttk.Combobox(top, textvariable=self.field_var, values=("subject", "author", "hash", "date"), state="readonly", width=8)
+        field.pack(side=tk.LEFT)
+        field.bind("<<ComboboxSelected>>", self.schedule_search)
+        self.count_var = tk.StringVar()
+        tk.Label(top, textvariable=self.count_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        frame = tk.Frame(self.win, bg="#2b2b2b")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=("hash", "author", "date", "subject"), show="headings")
+        for col, width in (("hash", 80), ("author", 140), ("date", 90), ("subject", 500)):
+            self.tree.heading(col, text=col.capitalize())
+            self.tree.column(col, width=width, stretch=(col == "subject"))
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: (scrollbar.set(first, last), self.on_scroll(first, last)))
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<Double-1>", self.show_commit)
+        self.tick()
+
+    def rows(self):
+        if self.source is not None:
+            return self.source
+        return self.preview if self.preview is not None else self.index.commits
+
+    def fill(self):
+        """Insert the next page of rows, if any are available."""
+        rows = self.rows()[self.shown:self.shown + self.PAGE]
+        for commit in rows:
+            self.tree.insert("", tk.END, values=(commit[0][:10],) + tuple(commit[1:]), iid=commit[0])
+        self.shown += len(rows)
+        self.update_count()
+
+    def update_count(self):
+        total = len(self.rows())
+        suffix = " (indexing...)" if not self.done else ""
+        self.count_var.set(f"{self.shown} of {total} commits{suffix}")
+
+    def on_scroll(self, first, last):
+        if float(last) > 0.9 and self.shown < len(self.rows()):
+            self.win.after_idle(self.fill)
+
+    def tick(self):
+        if not self.win.winfo_exists():
+            return
+        if self.shown < self.PAGE and self.shown < len(self.rows()):
+            self.fill()
+        self.update_count()
+        if not self.done:
+            self.win.after(200, self.tick)
+
+    def finished(self, new_commits):
+        """Called once the index is up to date; new commits go on top."""
+        self.done = True
+        if not self.win.winfo_exists():
+            return
+        previewed, self.preview = self.preview is not None, None
+        if (new_commits or previewed) and self.source is None:
+            self.reset()
+        self.tick()
+
+    def schedule_search(self, event=None):
+        if self.search_id is not None:
+            self.win.after_cancel(self.search_id)
+        self.search_id = self.win.after(150, self.search)
+
+    def search(self):
+        self.search_id = None
+        text = self.search_var.get().strip()
+        self.source = self.index.search(text, self.field_var.get()) if text else None
+        self.reset()
+
+    def reset(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.shown = 0
+        self.fill()
+
+    def show_commit(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.app.log_output(f"\n{'='*30} COMMIT {selection[0][:10]} {'='*30}\n")
+            self.app.run_git_command(['git', 'show', '--stat', selection[0]], "Commit details loaded", read_only=True)
+
+class StatusWindow:
+    """Collapsible file tree driven by StatusSnapshot updates.
+
+    Files are grouped per section and top-level path component; an update
+    only rebuilds the groups whose entries actually changed.
+    """
+    SECTIONS = ("Conflicts", "Staged", "Unstaged", "Untracked")
+    LABELS = {"M": "modified", "T": "type changed", "A": "added", "D": "deleted",
+              "R": "renamed", "C": "copied", "U": "unmerged", "?": "untracked"}
+
+    def __init__(self, app):
+        self.app = app
+        self.groups = {}
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Git Status")
+        self.win.geometry("600x500")
+        self.win.configure(bg="#2b2b2b")
+        self.branch_var = tk.StringVar()
+        tk.Label(self.win, textvariable=self.branch_var, anchor=tk.W, fg="white", bg="#2b2b2b",
+                 font=("Arial", 10, "bold")).pack(fill=tk.X, padx=10, pady=(10, 5))
+        frame = tk.Frame(self.win, bg="#2b2b2b")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=("state",))
+        self.tree.heading("#0", text="Path")
+        self.tree.heading("state", text="State")
+        self.tree.column("state", width=180, stretch=False)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for section in self.SECTIONS:
+            self.tree.insert("", tk.END, iid=section, text=section, open=True)
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def describe(self, section, entry):
+        if section == "Untracked":
+            return "untracked"
+        code = entry.xy[0] if section == "Staged" else entry.xy[1]
+        if section == "Conflicts":
+            code = "U"
+        label = self.LABELS.get(code, code)
+        if entry.orig and section == "Staged":
+            label += f" from {entry.orig}"
+        return label
+
+    def update(self, snap):
+        head = snap.head if snap.head != "(detached)" else f"detached at {(snap.oid or '')[:7]}"
+        self.branch_var.set(f"On branch {head}" + (f"  ↑{snap.ahead} ↓{snap.behind} {snap.upstream}" if snap.upstream else ""))
+        groups = {}
+        for section, entries in snap.sections().items():
+            for entry in entries:
+                groups.setdefault((section, entry.path.split("/", 1)[0]), []).append(entry)
+        groups = {key: tuple(entries) for key, entries in groups.items()}
+        for key in set(self.groups) - set(groups):
+            self.tree.delete(f"{key[0]}:{key[1]}")
+        for key, entries in sorted(groups.items()):
+            if self.groups.get(key) != entries:
+                self.rebuild(key, entries, sorted(k[1] for k in groups if k[0] == key[0]))
+        self.groups = groups
+        for section in self.SECTIONS:
+            count = sum(len(v) for k, v in groups.items() if k[0] == section)
+            self.tree.item(section, text=f"{section} ({count})")
+
+    def rebuild(self, key, entries, siblings):
+        section, top = key
+        iid = f"{section}:{top}"
+        was_open = self.tree.exists(iid) and self.tree.item(iid, "open")
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+        position = siblings.index(top)
+        if len(entries) == 1 and entries[0].path.rstrip("/") == top:
+            self.tree.insert(section, position, iid=iid, text=entries[0].path, values=(self.describe(section, entries[0]),))
+            return
+        self.tree.insert(section, position, iid=iid, text=top + "/", open=was_open)
+        for entry in sorted(entries, key=lambda e: e.path):
+            parent = iid
+            parts = entry.path.rstrip("/").split("/")
+            for depth in range(1, len(parts) - 1):
+                node = f"{section}:{'/'.join(parts[:depth + 1])}"
+                if not self.tree.exists(node):
+                    self.tree.insert(parent, tk.END, iid=node, text=parts[depth] + "/")
+                parent = node
+            self.tree.insert(parent, tk.END, iid=f"{section}:{entry.path}:file",
+                             text=parts[-1] + ("/" if entry.path.endswith("/") else ""),
+                             values=(self.describe(section, entry),))
+
+def diff_insert_args(patch):
+    """``Text.insert`` arguments for a patch, one run of text per colour tag."""
+    args = []
+    for line in patch.splitlines(True):
+        if line.startswith("@@"):
+            tag = "hunk"
+        elif line.startswith(("+++", "---", "diff ", "index ", "new file", "deleted file", "similarity", "rename ", "old mode", "new mode", "Binary")):
+            tag = "meta"
+        elif line.startswith("+"):
+            tag = "add"
+        elif line.startswith("-"):
+            tag = "del"
+        else:
+            tag = "ctx"
+        if args and args[-1] == tag:
+            args[-2] += line
+        else:
+            args.extend((line, tag))
+    return args
+
+def describe_findings(flagged, scanner, limit=15):
+    """Dialog text listing the files the scanner flagged, largest first."""
+    lines = [f"{len(flagged)} files are larger than {format_bytes(scanner.max_bytes)} "
+             f"or binary and over {format_bytes(scanner.binary_bytes)}:", ""]
+    for f in flagged[:limit]:
+        lines.append(f"{format_bytes(f.size):>12}  {f.reason:6}  {f.path}")
+    if len(flagged) > limit:
+        lines.append(f"… and {len(flagged) - limit} more")
+    return "\n".join(lines)
+
+class DiffWindow:
+    """File list from ``--numstat`` with per-file patches loaded on selection."""
+    LIMIT = 256 * 1024
+
+    def __init__(self, app, staged=False):
+        self.app = app
+        self.staged = staged
+        self.files = {}
+        self.current = None
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Staged Changes" if staged else "Unstaged Changes")
+        self.win.geometry("1100x650")
+        self.win.configure(bg="#2b2b2b")
+        toolbar = tk.Frame(self.win, bg="#2b2b2b")
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.staged_var = tk.BooleanVar(value=staged)
+        tk.Checkbutton(toolbar, text="Staged", variable=self.staged_var, command=self.refresh,
+                       fg="white", bg="#2b2b2b", selectcolor="#404040", activebackground="#2b2b2b").pack(side=tk.LEFT)
+        tk.Button(toolbar, text="🔄 Refresh", command=self.refresh, bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        self.more_btn = tk.Button(toolbar, text="Load more", command=self.load_more, bg="#555", fg="white", font=("Arial", 9), state=tk.DISABLED)
+        self.more_btn.pack(side=tk.LEFT)
+        self.info_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.info_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        panes = tk.PanedWindow(self.win, orient=tk.HORIZONTAL, bg="#2b2b2b", sashwidth=4)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(panes, columns=("added", "deleted"), selectmode="browse")
+        self.tree.heading("#0", text="File")
+        self.tree.heading("added", text="+")
+        self.tree.heading("deleted", text="-")
+        self.tree.column("added", width=60, anchor=tk.E, stretch=False)
+        self.tree.column("deleted", width=60, anchor=tk.E, stretch=False)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        panes.add(self.tree, width=330)
+        text_frame = tk.Frame(panes, bg="#2b2b2b")
+        self.text = tk.Text(text_frame, bg="#1e1e1e", fg="#dddddd", font=("Consolas", 9), wrap=tk.NONE, state="disabled")
+        yscroll = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        xscroll = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        yscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        xscroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        panes.add(text_frame)
+        self.text.tag_configure("add", foreground="#50fa7b")
+        self.text.tag_configure("del", foreground="#ff5555")
+        self.text.tag_configure("hunk", foreground="#8be9fd")
+        self.text.tag_configure("meta", foreground="#bd93f9")
+        self.text.tag_configure("ctx", foreground="#dddddd")
+        self.refresh()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def refresh(self):
+        self.staged = self.staged_var.get()
+        self.win.title("Staged Changes" if self.staged else "Unstaged Changes")
+        self.info_var.set("Loading file list...")
+        app = self.app
+        repo = app.repo_path
+        staged = self.staged
+
+        def listed(job):
+            if not self.exists():
+                return
+            if not job.ok:
+                self.info_var.set(job.error_output.strip())
+                return
+            self.show_files(job.result)
+
+        app.executor.submit_call("diff-stat", lambda: read_diff_files(app.git_path, repo, staged), repo, listed,
+                                 key=(staged,))
+
+    def show_files(self, files):
+        selected = self.current.path if self.current else None
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.files = {f.path: f for f in files}
+        for f in files:
+            name = f.path if not f.orig else f"{f.orig} → {f.path}"
+            added = "bin" if f.binary else f.added
+            deleted = "" if f.binary else f.deleted
+            self.tree.insert("", tk.END, iid=f.path, text=name, values=(added, deleted))
+        total_add = sum(f.added or 0 for f in files)
+        total_del = sum(f.deleted or 0 for f in files)
+        self.info_var.set(f"{len(files)} files, +{total_add} -{total_del}")
+        if selected in self.files:
+            self.tree.selection_set(selected)
+        elif not files:
+            self.render("", False)
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.files:
+            self.load(self.files[selection[0]], self.LIMIT)
+
+    def load_more(self):
+        if self.current is not None:
+            cached = self.app.diff_cache.get(self.current.cache_key(self.app.repo_path) + (self.staged,))
+            limit = cached[2] * 4 if cached else self.LIMIT * 4
+            self.load(self.current, limit)
+
+    def load(self, diff_file, limit):
+        self.current = diff_file
+        app = self.app
+        repo = app.repo_path
+        staged = self.staged
+        key = diff_file.cache_key(repo) + (staged,)
+        cached = app.diff_cache.get(key)
+        if cached is not None and (cached[2] >= limit or not cached[1]):
+            self.render(cached[0], cached[1])
+            return
+        self.more_btn.config(state=tk.DISABLED)
+
+        def fetch():
+            text, truncated = read_file_diff(app.git_path, repo, diff_file, limit, staged)
+            app.diff_cache.put(key, (text, truncated, limit))
+            return text, truncated
+
+        def loaded(job):
+            if not self.exists() or self.current is not diff_file:
+                return
+            if job.ok:
+                self.render(*job.result)
+            else:
+                self.render(job.error_output, False)
+
+        app.executor.submit_call("diff", fetch, repo, loaded, key=key + (limit,))
+
+    def render(self, patch, truncated):
+        args = diff_insert_args(patch)
+        if truncated:
+            args.extend(("\n… diff truncated, use Load more to see the rest …\n", "meta"))
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        if args:
+            self.text.insert("1.0", *args)
+        self.text.config(state="disabled")
+        self.more_btn.config(state=tk.NORMAL if truncated else tk.DISABLED)
+
+class BranchWindow:
+    """Branch browser over one cached ``for-each-ref`` listing with an incremental fuzzy filter.
+
+    Only the best ``LIMIT`` matches are inserted into the tree, so typing
+    stays responsive with tens of thousands of refs.
+    """
+    LIMIT = 500
+    COLUMNS = ("branch", "track", "head", "upstream", "date", "subject")
+
+    def __init__(self, app):
+        self.app = app
+        self.branches = []
+        self.index = None
+        self.filter_id = None
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Branches")
+        self.win.geometry("950x550")
+        self.win.configure(bg="#2b2b2b")
+        top = tk.Frame(self.win, bg="#2b2b2b")
+        top.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Label(top, text="Filter / new name:", fg="white", bg="#2b2b2b", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.entry = tk.Entry(top, textvariable=self.filter_var, font=("Arial", 10), bg="#404040", fg="white", insertbackground="white")
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.entry.bind("<KeyRelease>", self.schedule_filter)
+        self.entry.bind("<Return>", lambda event: self.switch())
+        self.remote_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(top, text="Remote branches", variable=self.remote_var, command=self.rebuild,
+                       fg="white", bg="#2b2b2b", selectcolor="#404040", activebackground="#2b2b2b").pack(side=tk.LEFT)
+        self.count_var = tk.StringVar()
+        tk.Label(top, textvariable=self.count_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        buttons = tk.Frame(self.win, bg="#2b2b2b")
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+        tk.Button(buttons, text="🔀 Switch", command=self.switch, bg="#455A64", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(buttons, text="🌱 New Branch From Filter", command=self.create, bg="#1976D2", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(buttons, text="❌ Delete", command=self.delete, bg="#B71C1C", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(buttons, text="🔄 Refresh", command=lambda: self.refresh(force=True), bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        frame = tk.Frame(self.win, bg="#2b2b2b")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 5))
+        self.tree = ttk.Treeview(frame, columns=self.COLUMNS, show="headings", selectmode="browse")
+        for col, text, width in (("branch", "Branch", 260), ("track", "vs upstream", 90), ("head", "vs HEAD", 90),
+                                 ("upstream", "Upstream", 160), ("date", "Date", 90), ("subject", "Subject", 350)):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, stretch=(col == "subject"))
+        if not app.git_info.features.get("ahead_behind"):
+            self.tree.configure(displaycolumns=[col for col in self.COLUMNS if col != "head"])
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<Double-1>", lambda event: self.switch())
+        self.entry.focus_set()
+        self.refresh()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def refresh(self, force=False):
+        """Show the cached listing, or load it with one for-each-ref when refs changed since."""
+        app = self.app
+        state = app.repo_state
+        if state is None:
+            return
+        cached = None if force else state.cached("branches")
+        if cached is not None:
+            self.show(cached)
+            return
+        self.count_var.set("Loading branches...")
+        repo = state.repo_path
+        ahead_behind = app.git_info.features.get("ahead_behind", False)
+
+        def loaded(job):
+            if not self.exists():
+                return
+            if not job.ok:
+                self.count_var.set(job.error_output.strip())
+                return
+            if state is app.repo_state:
+                state.set("branches", job.result, generation)
+            self.show(job.result)
+
+        # %(ahead-behind:HEAD) fails on an unborn branch, so only ask for it when HEAD has a commit
+        generation = state.generation("branches")
+        app.executor.submit_call("branches", lambda: read_branches(app.git_path, repo, ahead_behind and state.get("head") is not None),
+                                 repo, loaded, key=(ahead_behind,))
+
+    def show(self, branches):
+        self.branches = branches
+        self.rebuild()
+
+    def rebuild(self):
+        remote = self.remote_var.get()
+        self.index = BranchIndex([b for b in self.branches if remote or not b.remote])
+        self.apply_filter()
+
+    def schedule_filter(self, event=None):
+        if self.filter_id is None:
+            self.filter_id = self.win.after(30, self.apply_filter)
+
+    def apply_filter(self):
+        self.filter_id = None
+        if self.index is None:
+            return
+        started = time.perf_counter()
+        branches, total = self.index.filter(self.filter_var.get().strip(), self.LIMIT)
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for b in branches:
+            if b.ahead is not None:
+                track = f"↑{b.ahead} ↓{b.behind}"
+            else:
+                track = "gone" if b.gone else ""
+            head = f"↑{b.head_ahead} ↓{b.head_behind}" if b.head_ahead is not None else ""
+            date = time.strftime("%Y-%m-%d", time.localtime(b.date)) if b.date else ""
+            self.tree.insert("", tk.END, iid=b.ref, values=(("* " if b.current else "  ") + b.name, track, head,
+                                                            b.upstream or "", date, b.subject))
+        if branches:
+            self.tree.selection_set(branches[0].ref)
+        shown = f"{len(branches)} of {total}" if total > len(branches) else f"{total}"
+        self.count_var.set(f"{shown} branches")
+        self.app.recorder.record("filter", "branches", started, time.perf_counter() - started,
+                                 shown=len(branches), matches=total)
+
+    def selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return next((b for b in self.index.branches if b.ref == selection[0]), None)
+
+    def finished(self, ok):
+        if self.exists():
+            self.refresh(force=True)
+
+    def switch(self):
+        branch = self.selected()
+        if branch is None or branch.current:
+            return
+        app = self.app
+        app.log_output(f"\n{'='*30} SWITCH BRANCH {'='*30}\n")
+        if branch.remote:
+            local = branch.name.split("/", 1)[1]
+            if any(b.name == local and not b.remote for b in self.branches):
+                command = ['git', 'checkout', local]
+            else:
+                command = ['git', 'checkout', '--track', branch.name]
+        else:
+            local = branch.name
+            command = ['git', 'checkout', local]
+        app.run_git_command(command, f"Switched to branch '{local}'", self.finished)
+
+    def create(self):
+        name = self.filter_var.get().strip()
+        if not name or " " in name:
+            messagebox.showerror("Error", "Type the new branch name into the filter box.", parent=self.win)
+            return
+        self.app.log_output(f"\n{'='*30} CREATE NEW BRANCH {'='*30}\n")
+        self.app.run_git_command(['git', 'checkout', '-b', name], f"Created and switched to branch '{name}'", self.finished)
+
+    def delete(self):
+        branch = self.selected()
+        if branch is None:
+            return
+        if branch.remote or branch.current:
+            messagebox.showerror("Error", "Only local branches other than the current one can be deleted here.", parent=self.win)
+            return
+        if not messagebox.askyesno("Delete Branch", f"Delete branch '{branch.name}'?", parent=self.win):
+            return
+        self.app.log_output(f"\n{'='*30} DELETE BRANCH {'='*30}\n")
+        self.app.run_git_command(['git', 'branch', '-d', branch.name], f"Deleted branch '{branch.name}'", self.finished)
+
+class StashWindow:
+    """Stash entries from one ``stash list``, with stats filled in afterwards and patches loaded on selection.
+
+    Apply, pop and drop update the shown list in place instead of listing
+    the stashes again; patches are kept in the app's DiffCache by stash id.
+    """
+    LIMIT = 256 * 1024
+
+    def __init__(self, app):
+        self.app = app
+        self.stashes = []
+        self.stats = {}
+        self.current = None
+        self.busy = False
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Stashes")
+        self.win.geometry("1100x650")
+        self.win.configure(bg="#2b2b2b")
+        toolbar = tk.Frame(self.win, bg="#2b2b2b")
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Button(toolbar, text="Apply", command=lambda: self.act("apply"), bg="#455A64", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Pop", command=lambda: self.act("pop"), bg="#6D4C41", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="❌ Drop", command=lambda: self.act("drop"), bg="#B71C1C", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="🔄 Refresh", command=lambda: self.refresh(force=True), bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        self.info_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.info_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        panes = tk.PanedWindow(self.win, orient=tk.VERTICAL, bg="#2b2b2b", sashwidth=4)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(panes, columns=("ref", "date", "stat", "message"), show="headings", selectmode="browse")
+        for col, text, width in (("ref", "Entry", 90), ("date", "Date", 130), ("stat", "Changes", 260), ("message", "Message", 450)):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, stretch=(col == "message"))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        panes.add(self.tree, height=200)
+        text_frame = tk.Frame(panes, bg="#2b2b2b")
+        self.text = tk.Text(text_frame, bg="#1e1e1e", fg="#dddddd", font=("Consolas", 9), wrap=tk.NONE, state="disabled")
+        yscroll = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=yscroll.set)
+        yscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for tag, color in (("add", "#50fa7b"), ("del", "#ff5555"), ("hunk", "#8be9fd"), ("meta", "#bd93f9"), ("ctx", "#dddddd")):
+            self.text.tag_configure(tag, foreground=color)
+        panes.add(text_frame)
+        self.refresh()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def refresh(self, force=False):
+        """Show the cached list, or read it again with one ``stash list``."""
+        app = self.app
+        state = app.repo_state
+        if state is None:
+            return
+        cached = None if force else state.cached("stashes")
+        if cached is not None:
+            self.show(cached)
+            return
+        self.info_var.set("Loading stashes...")
+        repo = state.repo_path
+
+        def loaded(job):
+            if not self.exists():
+                return
+            if not job.ok:
+                self.info_var.set(job.error_output.strip())
+                return
+            if state is app.repo_state:
+                state.set("stashes", job.result, generation)
+            self.show(job.result)
+
+        generation = state.generation("stashes")
+        app.executor.submit_call("stashes", lambda: read_stashes(app.git_path, repo), repo, loaded, key=())
+
+    def refs_changed(self):
+        """Skip the reload when refs/stash still points at the newest entry shown."""
+        state = self.app.repo_state
+        if state is None or state.common_dir is None:
+            return
+        newest = self.stashes[0].oid if self.stashes else None
+        if read_ref(state.common_dir, "refs/stash") == newest:
+            state.set("stashes", self.stashes)
+        else:
+            self.refresh(force=True)
+
+    def show(self, stashes):
+        selected = self.current.oid if self.current else None
+        self.stashes = stashes
+        self.stats = {s.oid: self.stats[s.oid] for s in stashes if s.oid in self.stats}
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for s in stashes:
+            date = time.strftime("%Y-%m-%d %H:%M", time.localtime(s.date)) if s.date else ""
+            self.tree.insert("", tk.END, iid=s.oid, values=(s.ref, date, self.stats.get(s.oid, "…"), s.message))
+        self.info_var.set(f"{len(stashes)} stashes")
+        if any(s.oid == selected for s in stashes):
+            self.tree.selection_set(selected)
+        elif stashes:
+            self.tree.selection_set(stashes[0].oid)
+        else:
+            self.current = None
+            self.render("", False)
+        self.load_stats()
+
+    def load_stats(self):
+        """Fill in the Changes column for entries not seen before, all in one background ``diff-tree``."""
+        missing = [s for s in self.stashes if s.oid not in self.stats]
+        if not missing:
+            return
+        app = self.app
+        repo = app.repo_path
+
+        def loaded(job):
+            if not self.exists() or not job.ok:
+                return
+            self.stats.update(job.result)
+            for oid, stat in job.result.items():
+                if self.tree.exists(oid):
+                    self.tree.set(oid, "stat", stat)
+
+        app.executor.submit_call("stash stats", lambda: read_stash_stats(app.git_path, repo, missing), repo, loaded)
+
+    def selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return next((s for s in self.stashes if s.oid == selection[0]), None)
+
+    def on_select(self, event=None):
+        stash = self.selected()
+        if stash is None or stash is self.current:
+            return
+        self.current = stash
+        app = self.app
+        repo = app.repo_path
+        key = ("stash", stash.oid)
+        cached = app.diff_cache.get(key)
+        if cached is not None:
+            self.render(cached[0], cached[1])
+            return
+
+        def fetch():
+            text, truncated = read_stash_patch(app.git_path, repo, stash, self.LIMIT)
+            app.diff_cache.put(key, (text, truncated, self.LIMIT))
+            return text, truncated
+
+        def loaded(job):
+            if not self.exists() or self.current is not stash:
+                return
+            if job.ok:
+                self.render(*job.result)
+            else:
+                self.render(job.error_output, False)
+
+        app.executor.submit_call("stash patch", fetch, repo, loaded, key=(stash.oid,))
+
+    def render(self, patch, truncated):
+        args = diff_insert_args(patch)
+        if truncated:
+            args.extend((f"\n… patch truncated at {format_bytes(self.LIMIT)} …\n", "meta"))
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        if args:
+            self.text.insert("1.0", *args)
+        self.text.config(state="disabled")
+
+    def act(self, action):
+        stash = self.selected()
+        if stash is None or self.busy:
+            return
+        if action == "drop" and not messagebox.askyesno("Drop Stash", f"Drop {stash.ref} ({stash.message})?", parent=self.win):
+            return
+        self.busy = True
+        app = self.app
+        repo = app.repo_path
+        app.log_output(f"\n{'='*30} STASH {action.upper()} {'='*30}\n")
+
+        def done(job):
+            self.busy = False
+            result = job.result
+            if result is not None:
+                app.log_output(f"Ran: git {' '.join(result.command[1:])}\n")
+                if result.stdout:
+                    app.log_output(result.stdout)
+                if result.stderr:
+                    app.log_output(result.stderr, tag="stderr")
+            if job.cancelled:
+                app.log_output("⛔ Cancelled\n", error=True)
+            elif not job.ok:
+                app.log_output(f"❌ Error: {job.error_output}", error=True)
+                if self.exists():
+                    self.refresh(force=True)
+            elif not result.ok:
+                app.log_output(f"❌ Error: git exited with code {result.returncode}\n", error=True)
+            else:
+                app.log_output(f"✅ {action.capitalize()} {stash.ref}\n")
+                if action != "apply" and self.exists():
+                    remaining = without_stash(self.stashes, stash.oid)
+                    if app.repo_state is not None:
+                        app.repo_state.set("stashes", remaining)
+                    self.current = None
+                    self.show(remaining)
+
+        app.executor.submit([f"stash {action}"], repo, done, quiet=True,
+                            func=lambda: run_stash_action(app.git_path, repo, action, stash))
+
+class StagingWindow:
+    """Pick files or hunks to stage and commit them.
+
+    Every action is one batched index update: selected paths go to a single
+    ``update-index --stdin``, selected hunks to a single ``apply --cached``,
+    and the commit runs right after them in the same background job.
+    """
+    LIMIT = 1024 * 1024
+    LABELS = StatusWindow.LABELS
+
+    def __init__(self, app):
+        self.app = app
+        self.entries = {}
+        self.current = None
+        self.header = ""
+        self.hunks = []
+        self.busy = False
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Stage & Commit")
+        self.win.geometry("1100x700")
+        self.win.configure(bg="#2b2b2b")
+        toolbar = tk.Frame(self.win, bg="#2b2b2b")
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Button(toolbar, text="🔄 Refresh", command=self.refresh, bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Stage Selected", command=self.stage_selected, bg="#388E3C", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Unstage Selected", command=self.unstage_selected, bg="#795548", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Stage All", command=self.stage_all, bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        self.info_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.info_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        commit_frame = tk.Frame(self.win, bg="#2b2b2b")
+        commit_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+        tk.Label(commit_frame, text="Message:", fg="white", bg="#2b2b2b", font=("Arial", 10)).pack(side=tk.LEFT)
+        self.message_var = tk.StringVar(value="Update files")
+        tk.Entry(commit_frame, textvariable=self.message_var, font=("Arial", 10), bg="#404040", fg="white",
+                 insertbackground="white").pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        commit_btn = tk.Button(commit_frame, text="💾 Commit", command=self.commit, bg="#FF9800", fg="white", font=("Arial", 10, "bold"))
+        commit_btn.pack(side=tk.LEFT)
+        ToolTip(commit_btn, "Stage the selected files, then commit everything staged.")
+        panes = tk.PanedWindow(self.win, orient=tk.HORIZONTAL, bg="#2b2b2b", sashwidth=4)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(panes, columns=("state",), selectmode="extended")
+        self.tree.heading("#0", text="File")
+        self.tree.heading("state", text="State")
+        self.tree.column("state", width=110, stretch=False)
+        self.tree.insert("", tk.END, iid="staged", text="Staged", open=True)
+        self.tree.insert("", tk.END, iid="changes", text="Changes", open=True)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        panes.add(self.tree, width=400)
+        right = tk.Frame(panes, bg="#2b2b2b")
+        hunk_bar = tk.Frame(right, bg="#2b2b2b")
+        hunk_bar.pack(fill=tk.X)
+        self.hunk_btn = tk.Button(hunk_bar, text="Stage Hunks", command=self.apply_hunks, bg="#555", fg="white",
+                                  font=("Arial", 9), state=tk.DISABLED)
+        self.hunk_btn.pack(side=tk.LEFT)
+        self.hunk_var = tk.StringVar()
+        tk.Label(hunk_bar, textvariable=self.hunk_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        self.hunk_tree = ttk.Treeview(right, columns=("lines",), selectmode="extended", height=6)
+        self.hunk_tree.heading("#0", text="Hunk")
+        self.hunk_tree.heading("lines", text="Lines")
+        self.hunk_tree.column("lines", width=90, stretch=False)
+        self.hunk_tree.bind("<<TreeviewSelect>>", self.on_hunk_select)
+        self.hunk_tree.pack(fill=tk.X, pady=5)
+        self.text = tk.Text(right, bg="#1e1e1e", fg="#dddddd", font=("Consolas", 9), wrap=tk.NONE, state="disabled")
+        self.text.pack(fill=tk.BOTH, expand=True)
+        for tag, color in (("add", "#50fa7b"), ("del", "#ff5555"), ("hunk", "#8be9fd"), ("meta", "#bd93f9"), ("ctx", "#dddddd")):
+            self.text.tag_configure(tag, foreground=color)
+        panes.add(right)
+        self.refresh()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def refresh(self):
+        self.info_var.set("Reading status...")
+        app = self.app
+        repo = app.repo_path
+
+        def done(job):
+            if not self.exists():
+                return
+            if job.ok:
+                self.show(job.result)
+            else:
+                self.info_var.set(job.error_output.strip())
+
+        app.executor.submit_call("staging status", lambda: read_status(app.git_path, repo, all_untracked=True), repo, done,
+                                 key=())
+
+    def show(self, snap):
+        selected = set(self.tree.selection())
+        for root in ("staged", "changes"):
+            children = self.tree.get_children(root)
+            if children:
+                self.tree.delete(*children)
+        self.entries = {}
+        sections = snap.sections()
+        for section, root in (("Staged", "staged"), ("Conflicts", "changes"), ("Unstaged", "changes"), ("Untracked", "changes")):
+            for entry in sections[section]:
+                iid = f"{root}:{entry.path}"
+                if iid in self.entries:
+                    continue
+                self.entries[iid] = (section, entry)
+                self.tree.insert(root, tk.END, iid=iid, text=entry.path, values=(self.describe(section, entry),))
+        staged = len(self.tree.get_children("staged"))
+        changes = len(self.tree.get_children("changes"))
+        self.tree.item("staged", text=f"Staged ({staged})")
+        self.tree.item("changes", text=f"Changes ({changes})")
+        self.info_var.set(f"{staged} staged, {changes} changed")
+        keep = [iid for iid in selected if iid in self.entries]
+        self.tree.selection_set(keep)
+        if not keep:
+            self.show_hunks(None, "", [], False)
+
+    def describe(self, section, entry):
+        if section == "Untracked":
+            return "untracked"
+        if section == "Conflicts":
+            return "conflict"
+        code = entry.xy[0] if section == "Staged" else entry.xy[1]
+        return self.LABELS.get(code, code)
+
+    def selected_paths(self, root):
+        return [self.entries[iid][1].path for iid in self.tree.selection()
+                if iid in self.entries and iid.startswith(root + ":")]
+
+    def run(self, name, build, success_msg, on_success=None):
+        """Run ``build()``'s commands in one background job; ``build`` runs on the worker thread."""
+        if self.busy:
+            return
+        self.busy = True
+        app = self.app
+        repo = app.repo_path
+        self.info_var.set(f"{name}...")
+
+        def done(job):
+            self.busy = False
+            results = job.result or []
+            for result in results:
+                app.log_output(f"Ran: git {' '.join(result.command[1:])}\n")
+                if result.stdout:
+                    app.log_output(result.stdout)
+                if result.stderr:
+                    app.log_output(result.stderr, tag="stderr")
+            if job.cancelled:
+                app.log_output("⛔ Cancelled\n", error=True)
+            elif not job.ok:
+                app.log_output(f"❌ Error: {job.error_output}", error=True)
+            elif results and not results[-1].ok:
+                app.log_output(f"❌ Error: git exited with code {results[-1].returncode}\n", error=True)
+            else:
+                app.log_output(f"✅ {success_msg}\n")
+                if on_success:
+                    on_success()
+            if self.exists():
+                self.refresh()
+
+        app.executor.submit([name], repo, done, quiet=True, func=lambda: run_staged(app.git_path, repo, build()))
+
+    def checked(self, paths, proceed):
+        """Call ``proceed(paths)`` once the scanner found no large or binary files among them, or the user decided.
+
+        Flagged files can be left out and added to .gitignore, staged anyway,
+        or the whole action cancelled.
+        """
+        if not paths:
+            proceed(paths)
+            return
+        app = self.app
+        repo = app.repo_path
+        self.info_var.set("Checking file sizes...")
+
+        def done(job):
+            if not self.exists():
+                return
+            if not job.ok:
+                app.log_output(f"❌ Error: {job.error_output}", error=True)
+                proceed(paths)
+                return
+            flagged = job.result
+            if not flagged:
+                proceed(paths)
+                return
+            answer = messagebox.askyesnocancel(
+                "Large Files", f"{describe_findings(flagged, app.scanner)}\n\n"
+                "Yes: leave them out and add them to .gitignore\nNo: stage them anyway\nCancel: stage nothing",
+                parent=self.win)
+            if answer is None:
+                self.info_var.set("Staging cancelled")
+                return
+            if answer:
+                app.ignore_files(flagged)
+                skipped = {f.path for f in flagged}
+                remaining = [path for path in paths if path not in skipped]
+                if not remaining:
+                    self.info_var.set("Nothing left to stage")
+                    self.refresh()
+                    return
+                proceed(remaining)
+            else:
+                proceed(paths)
+
+        app.executor.submit_call("scan", lambda: app.scanner.findings(repo, paths), repo, done)
+
+    def stage_selected(self):
+        paths = self.selected_paths("changes")
+        if paths:
+            self.checked(paths, lambda paths: self.run("stage", lambda: stage_commands(paths), f"Staged {len(paths)} paths"))
+
+    def unstage_selected(self):
+        paths = self.selected_paths("staged")
+        if paths:
+            git_path, repo = self.app.git_path, self.app.repo_path
+            self.run("unstage", lambda: unstage_commands(git_path, repo, paths), f"Unstaged {len(paths)} paths")
+
+    def stage_all(self):
+        paths = [entry.path for iid, (_, entry) in self.entries.items() if iid.startswith("changes:")]
+        if paths:
+            self.checked(paths, lambda paths: self.run("stage", lambda: stage_commands(paths), f"Staged {len(paths)} paths"))
+
+    def commit(self):
+        message = self.message_var.get().strip()
+        if not message:
+            messagebox.showerror("Error", "Please enter a commit message!", parent=self.win)
+            return
+        self.app.log_output("\n" + "="*30 + " COMMIT " + "="*30 + "\n")
+        self.checked(self.selected_paths("changes"), lambda paths: self.run(
+            "commit", lambda: stage_commands(paths, message=message), f"Committed with message: '{message}'",
+            lambda: self.message_var.set("")))
+
+    def on_select(self, event=None):
+        selection = [iid for iid in self.tree.selection() if iid in self.entries]
+        if len(selection) != 1:
+            self.show_hunks(None, "", [], False)
+            if selection:
+                self.hunk_var.set(f"{len(selection)} files selected")
+            return
+        section, entry = self.entries[selection[0]]
+        if section in ("Untracked", "Conflicts"):
+            self.show_hunks(None, "", [], False)
+            self.hunk_var.set("New file: stage the whole file" if section == "Untracked" else "Resolve the conflict, then stage the file")
+            return
+        staged = section == "Staged"
+        diff_file = DiffFile(entry.path, entry.orig if staged else None)
+        app = self.app
+        repo = app.repo_path
+        self.hunk_var.set("Loading hunks...")
+
+        def loaded(job):
+            if not self.exists() or self.tree.selection() != (selection[0],):
+                return
+            if not job.ok:
+                self.hunk_var.set(job.error_output.strip())
+                return
+            text, truncated = job.result
+            header, hunks = split_hunks(text)
+            self.show_hunks((staged, entry.path), header, hunks, truncated)
+
+        app.executor.submit_call("hunks", lambda: read_file_diff(app.git_path, repo, diff_file, self.LIMIT, staged), repo, loaded,
+                                 key=(staged, diff_file.path, diff_file.orig))
+
+    def show_hunks(self, current, header, hunks, truncated):
+        self.current = current
+        self.header = header
+        self.hunks = [] if truncated else hunks
+        children = self.hunk_tree.get_children()
+        if children:
+            self.hunk_tree.delete(*children)
+        for i, hunk in enumerate(self.hunks):
+            lines = hunk.splitlines()
+            added = sum(1 for line in lines[1:] if line.startswith("+"))
+            deleted = sum(1 for line in lines[1:] if line.startswith("-"))
+            self.hunk_tree.insert("", tk.END, iid=str(i), text=lines[0], values=(f"+{added} -{deleted}",))
+        staged = current is not None and current[0]
+        self.hunk_btn.config(text="Unstage Hunks" if staged else "Stage Hunks",
+                             state=tk.NORMAL if self.hunks else tk.DISABLED)
+        if truncated:
+            self.hunk_var.set("Diff too large for hunk selection; stage the whole file")
+        elif current is not None:
+            self.hunk_var.set(f"{len(self.hunks)} hunks" if self.hunks else "No text hunks (binary or mode change)")
+        else:
+            self.hunk_var.set("")
+        self.render(header + "".join(hunks))
+
+    def on_hunk_select(self, event=None):
+        chosen = [self.hunks[int(iid)] for iid in self.hunk_tree.selection()]
+        self.render(self.header + "".join(chosen or self.hunks))
+
+    def render(self, patch):
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        args = diff_insert_args(patch)
+        if args:
+            self.text.insert("1.0", *args)
+        self.text.config(state="disabled")
+
+    def apply_hunks(self):
+        chosen = [self.hunks[int(iid)] for iid in sorted(self.hunk_tree.selection(), key=int)]
+        if not chosen or self.current is None:
+            return
+        staged, path = self.current
+        patch = self.header + "".join(chosen)
+        if staged:
+            git_path, repo = self.app.git_path, self.app.repo_path
+            self.run("unstage", lambda: unstage_commands(git_path, repo, patch=patch), f"Unstaged {len(chosen)} hunks of {path}")
+        else:
+            self.run("stage", lambda: stage_commands(patch=patch), f"Staged {len(chosen)} hunks of {path}")
+
+class PerfWindow:
+    """Recent command, render and stall timings with JSON / Chrome trace export."""
+    COLUMNS = ("kind", "name", "ms", "spawn", "exit", "out", "err", "detail")
+
+    def __init__(self, app):
+        self.app = app
+        self.shown = 0
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Performance")
+        self.win.geometry("1000x550")
+        self.win.configure(bg="#2b2b2b")
+        toolbar = tk.Frame(self.win, bg="#2b2b2b")
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+        tk.Button(toolbar, text="Export JSON...", command=lambda: self.export(False), bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Export Chrome Trace...", command=lambda: self.export(True), bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Clear", command=self.clear, bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        self.summary_var = tk.StringVar()
+        tk.Label(self.win, textvariable=self.summary_var, justify=tk.LEFT, anchor=tk.W, fg="#ddd", bg="#2b2b2b",
+                 font=("Consolas", 9)).pack(fill=tk.X, padx=10)
+        frame = tk.Frame(self.win, bg="#2b2b2b")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 10))
+        self.tree = ttk.Treeview(frame, columns=self.COLUMNS, show="headings")
+        for col, width in zip(self.COLUMNS, (70, 160, 70, 60, 40, 80, 80, 400)):
+            self.tree.heading(col, text=col.capitalize())
+            self.tree.column(col, width=width, stretch=(col == "detail"))
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.refresh()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def refresh(self):
+        if not self.exists():
+            return
+        if self.app.recorder.total < self.shown:
+            self.tree.delete(*self.tree.get_children())
+            self.shown = 0
+        records, self.shown = self.app.recorder.since(self.shown)
+        for entry in records:
+            spawn = entry.get("spawn")
+            detail = " ".join(entry.get("args", [])[1:]) or entry.get("cwd") or ""
+            if entry["kind"] == "render":
+                detail = f"{entry['lines']} lines, {entry['chars']} chars, {entry['trimmed']} trimmed"
+            elif entry["kind"] == "filter":
+                detail = f"{entry['shown']} shown of {entry['matches']} matches"
+            self.tree.insert("", 0, values=(entry["kind"], entry["name"], f"{entry['duration'] * 1000:.1f}",
+                                            f"{spawn * 1000:.1f}" if spawn is not None else "",
+                                            entry.get("exit", ""), entry.get("stdout_bytes", ""),
+                                            entry.get("stderr_bytes", ""), detail))
+        children = self.tree.get_children()
+        if len(children) > 1000:
+            self.tree.delete(*children[1000:])
+        lines = [f"{kind:8} {name[:24]:24} n={s['count']:<5} p50={s['p50'] * 1000:8.1f}ms  p95={s['p95'] * 1000:8.1f}ms  max={s['max'] * 1000:8.1f}ms"
+                 for (kind, name), s in sorted(self.app.recorder.summary().items())[:12]]
+        self.summary_var.set("\n".join(lines) or "No records yet.")
+        self.win.after(1000, self.refresh)
+
+    def clear(self):
+        self.app.recorder.clear()
+        self.tree.delete(*self.tree.get_children())
+
+    def export(self, chrome_trace):
+        path = filedialog.asksaveasfilename(parent=self.win, defaultextension=".json",
+                                            initialfile="gitpushgui_trace.json" if chrome_trace else "gitpushgui_perf.json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            try:
+                self.app.recorder.export(path, chrome_trace)
+                self.app.set_status(f"Exported {path}")
+            except OSError as e:
+                messagebox.showerror("Export failed", str(e), parent=self.win)
+
+class TransferWindow:
+    """Progress bar for a push, pull or fetch, fed from git's ``--progress`` output."""
+    REFRESH_MS = 100
+
+    def __init__(self, app, title):
+        self.app = app
+        self.progress = TransferProgress()
+        self.win = tk.Toplevel(app.root)
+        self.win.title(title)
+        self.win.geometry("420x150")
+        self.win.configure(bg="#2b2b2b")
+        self.win.transient(app.root)
+        self.win.protocol("WM_DELETE_WINDOW", app.cancel_git_command)
+        self.phase_var = tk.StringVar(value=f"{title} Connecting...")
+        self.detail_var = tk.StringVar()
+        tk.Label(self.win, textvariable=self.phase_var, anchor=tk.W, fg="white", bg="#2b2b2b",
+                 font=("Arial", 11, "bold")).pack(fill=tk.X, padx=15, pady=(15, 5))
+        self.bar = ttk.Progressbar(self.win, mode="determinate", maximum=100)
+        self.bar.pack(fill=tk.X, padx=15)
+        tk.Label(self.win, textvariable=self.detail_var, anchor=tk.W, fg="#ddd", bg="#2b2b2b",
+                 font=("Consolas", 9)).pack(fill=tk.X, padx=15, pady=5)
+        tk.Button(self.win, text="Cancel", command=app.cancel_git_command, bg="#555", fg="white",
+                  font=("Arial", 9)).pack(pady=(0, 10))
+        self.after_id = self.win.after(self.REFRESH_MS, self.refresh)
+
+    def refresh(self):
+        progress = self.progress
+        if progress.phase:
+            self.phase_var.set(f"{progress.phase}...")
+            self.bar.config(value=progress.percent)
+            self.detail_var.set(f"{progress.describe()}  ({progress.elapsed:.1f}s)")
+        self.after_id = self.win.after(self.REFRESH_MS, self.refresh)
+
+    def close(self):
+        """Destroy the window and return a one-line summary of the transfer."""
+        self.win.after_cancel(self.after_id)
+        self.win.destroy()
+        return self.progress.summary()
+
+class WorkspaceWindow:
+    """Runs status/fetch/pull/push across many repositories on a bounded pool."""
+    COLUMNS = ("repo", "branch", "operation", "result", "time", "detail")
+
+    def __init__(self, app):
+        self.app = app
+        self.executor = None
+        self.started = None
+        self.sort_column = "repo"
+        self.sort_reverse = False
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Workspace")
+        self.win.geometry("1000x500")
+        self.win.configure(bg="#2b2b2b")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+        toolbar = tk.Frame(self.win, bg="#2b2b2b")
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+        for text, command in (("➕ Add Repo", self.add_repo), ("📁 Add Folder", self.add_folder), ("➖ Remove", self.remove)):
+            tk.Button(toolbar, text=text, command=command, bg="#555", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        for op in ("status", "fetch", "pull", "push"):
+            tk.Button(toolbar, text=f"{op.capitalize()} All", command=lambda op=op: self.run_all(op),
+                      bg="#1976D2", fg="white", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="⛔ Cancel", command=self.cancel, bg="#333", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
+        tk.Label(toolbar, text="Parallel:", fg="white", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 2))
+        self.concurrency_var = tk.IntVar(value=app.workspace_concurrency)
+        tk.Spinbox(toolbar, from_=1, to=32, width=4, textvariable=self.concurrency_var).pack(side=tk.LEFT)
+        self.summary_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.summary_var, fg="#aaa", bg="#2b2b2b", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 0))
+        frame = tk.Frame(self.win, bg="#2b2b2b")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(frame, columns=self.COLUMNS, show="headings")
+        for col, width in zip(self.COLUMNS, (260, 120, 80, 80, 60, 360)):
+            self.tree.heading(col, text=col.capitalize(), command=lambda col=col: self.sort_by(col))
+            self.tree.column(col, width=width, stretch=(col == "detail"))
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for repo in app.workspace_repos:
+            self.insert_row(repo)
+        self.poll()
+
+    def exists(self):
+        return self.win.winfo_exists()
+
+    def branch_of(self, repo):
+        git_dir = find_git_dir(repo)
+        return (read_head(git_dir)[0] or "") if git_dir else "(not a repo)"
+
+    def insert_row(self, repo):
+        if not self.tree.exists(repo):
+            self.tree.insert("", tk.END, iid=repo, values=(repo, self.branch_of(repo), "", "", "", ""))
+
+    def add_repos(self, repos):
+        for repo in repos:
+            if repo not in self.app.workspace_repos:
+                self.app.workspace_repos.append(repo)
+                self.insert_row(repo)
+        self.app.save_settings()
+
+    def add_repo(self):
+        folder = filedialog.askdirectory(title="Add Repository", parent=self.win)
+        if folder:
+            self.add_repos([folder])
+
+    def add_folder(self):
+        folder = filedialog.askdirectory(title="Add All Repositories In Folder", parent=self.win)
+        if folder:
+            found = sorted(os.path.join(folder, name).replace("\\", "/") for name in os.listdir(folder)
+                           if os.path.exists(os.path.join(folder, name, ".git")))
+            self.add_repos(found)
+            self.summary_var.set(f"Added {len(found)} repositories")
+
+    def remove(self):
+        for repo in self.tree.selection():
+            self.tree.delete(repo)
+            if repo in self.app.workspace_repos:
+                self.app.workspace_repos.remove(repo)
+        self.app.save_settings()
+
+    def set_row(self, repo, **values):
+        if self.tree.exists(repo):
+            for col, value in values.items():
+                self.tree.set(repo, col, value)
+
+    def run_all(self, op):
+        if self.executor is not None and self.executor.busy():
+            messagebox.showinfo("Workspace", "Operations are still running.", parent=self.win)
+            return
+        try:
+            concurrency = max(1, min(32, int(self.concurrency_var.get())))
+        except (tk.TclError, ValueError):
+            concurrency = self.app.workspace_concurrency
+        self.app.workspace_concurrency = concurrency
+        self.app.save_settings()
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.executor = GitExecutor(workers=concurrency, recorder=self.app.recorder)
+        self.started = time.perf_counter()
+        for repo in self.app.workspace_repos:
+            self.set_row(repo, branch=self.branch_of(repo), operation=op, result="queued", time="", detail="")
+            callback = lambda job, repo=repo, op=op: self.finished(repo, op, job)
+            if op == "status":
+                self.executor.submit_call("status", lambda repo=repo: read_status(self.app.git_path, repo), repo, callback, key=())
+            else:
+                self.executor.submit(self.app.git_command(['git'] + WORKSPACE_COMMANDS[op]), repo, callback, quiet=True)
+
+    def finished(self, repo, op, job):
+        if job.cancelled:
+            result, detail = "cancelled", ""
+        elif job.ok:
+            result = "ok"
+            if op == "status":
+                detail = " | ".join(job.result.summary().strip().splitlines())
+            else:
+                lines = (job.output + job.error_output).strip().splitlines()
+                detail = lines[-1] if lines else ""
+        else:
+            result = "failed"
+            lines = job.error_output.strip().splitlines()
+            detail = lines[-1] if lines else f"exit code {job.returncode}"
+            self.app.log_output(f"❌ {repo}: {op} failed: {detail}\n", error=True)
+        elapsed = f"{job.elapsed:.2f}" if job.elapsed is not None else ""
+        self.set_row(repo, branch=self.branch_of(repo), result=result, time=elapsed, detail=detail)
+
+    def poll(self):
+        if not self.exists():
+            return
+        if self.executor is not None:
+            for kind, job, _ in self.executor.poll():
+                if kind == "done":
+                    for callback in job.callbacks:
+                        callback(job)
+            for job in list(self.executor.running):
+                self.set_row(job.cwd, result="running")
+            results = [self.tree.set(repo, "result") for repo in self.tree.get_children()]
+            done = sum(1 for r in results if r in ("ok", "failed", "cancelled"))
+            failed = results.count("failed")
+            if self.started is not None and results:
+                elapsed = time.perf_counter() - self.started
+                self.summary_var.set(f"{done}/{len(results)} done, {failed} failed, {elapsed:.1f}s")
+                if done == len(results):
+                    self.started = None
+        self.win.after(100, self.poll)
+
+    def sort_by(self, col):
+        self.sort_reverse = not self.sort_reverse if self.sort_column == col else False
+        self.sort_column = col
+
+        def key(repo):
+            value = self.tree.set(repo, col)
+            if col == "time":
+                try:
+                    return (0, float(value))
+                except ValueError:
+                    return (1, 0.0)
+            return (0, value.lower())
+
+        for position, repo in enumerate(sorted(self.tree.get_children(), key=key, reverse=self.sort_reverse)):
+            self.tree.move(repo, "", position)
+
+    def cancel(self):
+        if self.executor is not None:
+            self.executor.cancel()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.win.destroy()
+
 class GitPushGUI:
-    def __init__(self, root):
+    HEARTBEAT_MS = 100
+    STARTUP_TARGET_MS = 200
+    AUTO_FETCH_TICK_MS = 15000
+    AUTO_FETCH_FIRST_S = 20
+
+    def __init__(self, root, started=None, exit_after_startup=False):
         self.root = root
+        self.started = started or time.perf_counter()
+        self.exit_after_startup = exit_after_startup
         self.root.title("Git Push Helper")
         self.root.geometry("900x700")
         self.root.configure(bg="#2b2b2b")
         self.repo_path = ""
-        self.git_path = self.find_git_executable()
+        self.repo_state = None
+        self.history_indexes = {}
+        self.status_window = None
+        self.diff_window = None
+        self.diff_cache = DiffCache()
+        self.workspace_window = None
+        self.staging_window = None
+        self.branch_window = None
+        self.stash_window = None
+        self.workspace_repos = []
+        self.workspace_concurrency = 4
+        self.settings = SettingsStore()
+        self.scanner = FileScanner(max_bytes=int(self.settings.get("large_file_mb", 25)) * 1024 * 1024,
+                                   binary_bytes=int(self.settings.get("binary_file_kb", 1024)) * 1024)
+        self.recorder = PerfRecorder()
+        discovery_started = time.perf_counter()
+        self.git_info = discover_git()
+        self.recorder.record("startup", "git discovery", discovery_started, time.perf_counter() - discovery_started)
+        self.git_path = self.git_info.path
+        self.perf_window = None
+        self.executor = GitExecutor(recorder=self.recorder)
+        # Network fetches get their own worker so they never hold up status, diff or history reads.
+        self.background = GitExecutor(recorder=self.recorder)
+        self.fetch_scheduler = FetchScheduler(interval=max(60, int(self.settings.get("fetch_interval_s", 300))))
+        self.fetching = False
+        self.after_fetch = []
+        self.tracking = None
+        self.auto_fetch_var = tk.BooleanVar(value=bool(self.settings.get("auto_fetch", False)))
+        self.backend = GitBackend(self.git_path)
         self.all_buttons = []
         self.status_var = tk.StringVar()
         self.status_var.set("")
+        self.repo_info_var = tk.StringVar()
+        self.status_after_id = None
         self.setup_ui()
         self.setup_tags()
         self.load_settings()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(50, self.process_git_events)
+        self.root.after(self.HEARTBEAT_MS, self.heartbeat)
+        self.root.after(self.AUTO_FETCH_TICK_MS, self.auto_fetch_tick)
+        self.root.bind_all("<KeyPress>", self.mark_activity, add="+")
+        self.root.bind_all("<ButtonPress>", self.mark_activity, add="+")
+        self.record_startup("ui built")
+        self.root.after_idle(self.finish_startup)
+
+    def record_startup(self, phase):
+        """Record the time from process start to ``phase`` and return it in seconds."""
+        elapsed = time.perf_counter() - self.started
+        self.recorder.record("startup", phase, self.started, elapsed)
+        return elapsed
+
+    def finish_startup(self):
+        """Runs once the window is up: build the rest of the UI, then open the last repository."""
+        self.record_startup("first paint")
+        self.setup_secondary_buttons()
         self.root.update_idletasks()
-        min_width = self.root.winfo_width()
-        min_height = self.root.winfo_height()
-        self.root.minsize(min_width, min_height)
-
-    def find_git_executable(self):
-        """Find Git executable on Windows"""
-        common_paths = [
-            r"C:\Program Files\Git\bin\git.exe",
-            r"C:\Program Files (x86)\Git\bin\git.exe",
-            r"C:\Users\{}\AppData\Local\Programs\Git\bin\git.exe".format(os.getenv('USERNAME')),
-            "git"
-        ]
-        
-        try:
-            result = subprocess.run(['where', 'git'], capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                git_path = result.stdout.strip().split('\n')[0]
-                return git_path
-        except:
-            pass
-        
+        self.root.minsize(self.root.winfo_width(), self.root.winfo_height())
+        self.open_repo(self.repo_path)
+        elapsed = self.record_startup("interactive")
+        over = f" (target {self.STARTUP_TARGET_MS} ms)" if elapsed * 1000 > self.STARTUP_TARGET_MS else ""
+        self.set_status(f"Ready in {elapsed * 1000:.0f} ms{over}")
+        if self.exit_after_startup:
+            print(f"{elapsed * 1000:.1f}")
+            self.on_close()
 
-        for path in common_paths:
-            if path == "git":
-                git_exe = shutil.which("git")
-                if git_exe:
-                    return git_exe
-            elif os.path.exists(path):
-                return path
-        
-        return "git"
-    
     def setup_tags(self):
         self.output_text.tag_configure("error", foreground="#ff5555")
         self.output_text.tag_configure("info", foreground="#00ff00")
+        self.output_text.tag_configure("stderr", foreground="#ffb86c")
 
-    def log_output(self, message, error=False):
-        tag = "error" if error else "info"
-        self.output_text.config(state="normal")
-        self.output_text.insert(tk.END, message, tag)
-        self.output_text.see(tk.END)
-        self.output_text.config(state="disabled")
-        if error:
+    def log_output(self, message, error=False, tag=None):
+        tag = tag or ("error" if error else "info")
+        self.console.append(message, tag)
+
+    def console_flushed(self, chunks):
+        if any(tag == "error" for _, tag in chunks):
             self.set_status("Error occurred. See output.")
-        elif message.strip():
-            self.set_status(message.strip().splitlines()[-1][:60])
-        self.root.update()
+            return
+        for chunk, _ in reversed(chunks):
+            if chunk.strip():
+                self.set_status(chunk.strip().splitlines()[-1][:60])
+                return
+
+    def process_git_events(self):
+        for kind, job, line in self.executor.poll() + self.background.poll():
+            if kind == "stdout":
+                self.log_output(line)
+            elif kind == "stderr":
+                if job.progress is None or job.progress.feed(line) != "progress":
+                    self.log_output(line, tag="stderr")
+            else:
+                for callback in job.callbacks:
+                    try:
+                        callback(job)
+                    except Exception as e:
+                        self.log_output(f"❌ Error: {str(e)}\n", error=True)
+        if self.repo_state is not None:
+            changed = self.repo_state.poll_changes()
+            if changed:
+                self.fetch_scheduler.touch()
+                self.refresh_repo_info()
+            if changed & {"HEAD", "refs"}:
+                self.refresh_tracking()
+            if changed & {"HEAD", "index", "refs"} and self.status_window is not None and self.status_window.exists():
+                self.refresh_status()
+            if changed & {"HEAD", "index"} and self.staging_window is not None and self.staging_window.exists():
+                self.staging_window.refresh()
+            if changed & {"HEAD", "refs", "config"} and self.branch_window is not None and self.branch_window.exists():
+                self.branch_window.refresh()
+            if "refs" in changed and self.stash_window is not None and self.stash_window.exists():
+                self.stash_window.refs_changed()
+            if "config" in changed:
+                self.refresh_remotes()
+        self.cancel_btn.config(state=tk.NORMAL if self.executor.busy() else tk.DISABLED)
+        self.root.after(50, self.process_git_events)
+
+    def heartbeat(self):
+        stall = self.recorder.heartbeat(self.HEARTBEAT_MS / 1000)
+        if stall is not None:
+            self.set_status(f"UI stalled for {stall['duration'] * 1000:.0f} ms")
+        self.root.after(self.HEARTBEAT_MS, self.heartbeat)
+
+    def open_performance(self):
+        if self.perf_window is None or not self.perf_window.exists():
+            self.perf_window = PerfWindow(self)
+        else:
+            self.perf_window.win.lift()
+
+    def cancel_git_command(self):
+        if self.executor.busy():
+            self.executor.cancel()
+            self.set_status("Cancelling...")
+
+    def open_repo(self, folder):
+        """Switch the cached repository state to ``folder`` and start watching it.
+
+        The snapshot saved last time is shown right away; a background
+        refresh then reconciles it with the repository and saves a new one.
+        """
+        if self.repo_state is not None:
+            self.repo_state.stop()
+        self.repo_state = RepoState(folder, self.backend) if folder else None
+        if self.repo_state is not None:
+            self.repo_state.start()
+        self.tracking = None
+        self.fetch_scheduler.reset(delay=self.AUTO_FETCH_FIRST_S)
+        self.refresh_repo_info()
+        if not folder:
+            return
+        snapshot = self.settings.snapshot(folder)
+        if snapshot:
+            self.show_snapshot(snapshot)
+        if self.status_window is not None and self.status_window.exists():
+            self.refresh_status()
+        self.refresh_tracking()
+
+        def reconciled(job):
+            if folder != self.repo_path:
+                return
+            if not job.ok:
+                self.log_output(f"❌ Error: {job.error_output}", error=True)
+                return
+            fresh = job.result
+            if self.repo_state is not None:
+                self.repo_state.set("remotes", fresh["remotes"])
+            if fresh["branch"]:
+                self.branch_var.set(fresh["branch"])
+            origin = fresh["remotes"].get("origin")
+            if origin and origin != self.remote_var.get():
+                self.remote_var.set(origin)
+                self.log_output(f"Found remote: {origin}\n")
+            if snapshot and (snapshot.get("head"), snapshot.get("status")) != (fresh["head"], fresh["status"]):
+                self.log_output(f"Current state:\n{fresh['status'] or ''}")
+            self.settings.save_snapshot(folder, fresh)
+            self.settings.add_recent(folder)
+            self.save_settings()
+
+        self.executor.submit_call("snapshot", lambda: repo_snapshot(self.git_path, self.backend, folder), folder, reconciled)
+
+    def show_snapshot(self, snapshot):
+        """Fill the main window from a saved snapshot before the repository has been read."""
+        if snapshot.get("branch"):
+            self.branch_var.set(snapshot["branch"])
+        origin = (snapshot.get("remotes") or {}).get("origin")
+        if origin:
+            self.remote_var.set(origin)
+        age = time.time() - snapshot.get("saved", time.time())
+        when = f"{age / 3600:.0f} h" if age >= 3600 else f"{age / 60:.0f} min"
+        self.log_output(f"Last known state ({when} ago, refreshing...):\n{snapshot.get('status') or ''}")
+        for commit in snapshot.get("history", [])[:5]:
+            self.log_output(f"  {commit[0][:7]} | {commit[2]} | {commit[3]}\n")
+        if snapshot.get("upstream"):
+            self.tracking = (snapshot["upstream"], snapshot.get("ahead"), snapshot.get("behind"))
+            self.refresh_repo_info()
+
+    def update_snapshot(self, **values):
+        """Fold newer values for the open repository into its saved snapshot."""
+        if not self.repo_path:
+            return
+        snapshot = self.settings.snapshot(self.repo_path)
+        if snapshot is None or all(snapshot.get(k) == v for k, v in values.items()):
+            return
+        snapshot = dict(snapshot, saved=time.time(), **values)
+        self.settings.save_snapshot(self.repo_path, snapshot)
+
+    def refresh_repo_info(self):
+        state = self.repo_state
+        if state is None or state.git_dir is None:
+            self.repo_info_var.set("")
+            return
+        branch = state.get("branch")
+        head = state.get("head")
+        if branch and branch != "HEAD" and branch != self.branch_var.get():
+            self.branch_var.set(branch)
+        info = f"⎇ {branch}" if branch else ""
+        if head:
+            info += f" @ {head[:7]}"
+        sync = self.sync_text()
+        if sync:
+            info += f"  ·  {sync}"
+        self.repo_info_var.set(info)
+        self.update_snapshot(branch=branch, head=head)
+
+    def sync_text(self):
+        """Ahead/behind against the upstream as of the last fetch, and how that fetch went."""
+        parts = []
+        if self.tracking is not None:
+            upstream, ahead, behind = self.tracking
+            parts.append(f"{upstream} gone" if ahead is None else f"↑{ahead} ↓{behind} {upstream}")
+        scheduler = self.fetch_scheduler
+        if self.auto_fetch_var.get():
+            if scheduler.failures:
+                parts.append("fetch failed")
+            elif scheduler.last_fetch:
+                parts.append("fetched " + time.strftime("%H:%M", time.localtime(scheduler.last_fetch)))
+        return "  ·  ".join(parts)
+
+    def refresh_tracking(self):
+        """Recount ahead/behind from local refs; no network access."""
+        state = self.repo_state
+        if state is None or state.git_dir is None:
+            return
+
+        def loaded(job):
+            if state is not self.repo_state or not job.ok:
+                return
+            self.tracking = job.result
+            self.refresh_repo_info()
+            if job.result is not None:
+                upstream, ahead, behind = job.result
+                self.update_snapshot(upstream=upstream, ahead=ahead, behind=behind)
+
+        self.executor.submit_call("tracking", lambda: read_tracking(self.git_path, state.repo_path, state.get("branch")),
+                                  state.repo_path, loaded, key=())
+
+    def defer_for_fetch(self, retry):
+        """Hold a manual transfer until a running background fetch finishes; True when it was held.
+
+        Both would take the same ref locks, and the user's command would fail.
+        """
+        if not self.fetching:
+            return False
+        self.after_fetch.append(retry)
+        self.set_status("Waiting for the background fetch to finish...")
+        return True
+
+    def mark_activity(self, event=None):
+        self.fetch_scheduler.touch()
+
+    def toggle_auto_fetch(self):
+        self.fetch_scheduler.reset(delay=self.AUTO_FETCH_FIRST_S)
+        self.refresh_repo_info()
+        self.save_settings()
+
+    def auto_fetch_tick(self):
+        """Start a background fetch when the scheduler says one is due.
+
+        Skipped while the window is minimized, while other git work (such
+        as a manual fetch, pull or push) is running or queued, and for
+        repositories without a remote.
+        """
+        self.root.after(self.AUTO_FETCH_TICK_MS, self.auto_fetch_tick)
+        state = self.repo_state
+        if (not self.auto_fetch_var.get() or self.fetching or state is None or state.git_dir is None
+                or self.executor.busy() or self.root.state() == "iconic" or not self.fetch_scheduler.due()):
+            return
+        if not state.cached("remotes"):
+            return
+        self.fetching = True
+        repo = state.repo_path
+        scheduler = self.fetch_scheduler
+
+        def fetched(job):
+            self.fetching = False
+            waiting, self.after_fetch = self.after_fetch, []
+            for retry in waiting:
+                retry()
+            if state is not self.repo_state:
+                return
+            result, changed = job.result if job.ok else (None, False)
+            if result is not None and result.ok:
+                scheduler.succeeded(changed)
+                if changed:
+                    self.set_status("Background fetch: the remote has new commits")
+            else:
+                scheduler.failed()
+                if scheduler.failures == 1:
+                    error = result.stderr if result is not None else job.error_output
+                    self.log_output(f"Background fetch failed, retrying later: {error.strip()}\n", tag="stderr")
+            self.refresh_tracking()
+
+        self.background.submit_call("background fetch", lambda: background_fetch(self.git_path, repo), repo, fetched)
+
+    def refresh_remotes(self):
+        state = self.repo_state
+
+        def loaded(job):
+            if job.ok and state is self.repo_state and job.result.get("origin"):
+                self.remote_var.set(job.result["origin"])
+
+        self.executor.submit_call("remotes", lambda: state.get("remotes"), state.repo_path, loaded)
+
+    def on_close(self):
+        if self.repo_state is not None:
+            self.repo_state.stop()
+        self.executor.cancel()
+        self.background.cancel()
+        self.backend.close_all()
+        self.console.close()
+        self.save_settings()
+        self.settings.flush()
+        self.root.destroy()
 
     def enable_buttons(self, enable=True):
         state = tk.NORMAL if enable else tk.DISABLED
@@ -102,6 +1862,20 @@ class GitPushGUI:
 
     def setup_ui(self):
         menubar = tk.Menu(self.root)
+        filemenu = tk.Menu(menubar, tearoff=0)
+        filemenu.add_command(label="Open Repository...", command=self.browse_repository)
+        self.recent_menu = tk.Menu(filemenu, tearoff=0, postcommand=self.populate_recent_menu)
+        filemenu.add_cascade(label="Recent Repositories", menu=self.recent_menu)
+        menubar.add_cascade(label="File", menu=filemenu)
+        viewmenu = tk.Menu(menubar, tearoff=0)
+        viewmenu.add_command(label="Open Older Output...", command=self.open_full_output)
+        viewmenu.add_command(label="Performance...", command=self.open_performance)
+        viewmenu.add_separator()
+        viewmenu.add_checkbutton(label="Background Fetch", variable=self.auto_fetch_var, command=self.toggle_auto_fetch)
+        menubar.add_cascade(label="View", menu=viewmenu)
+        toolsmenu = tk.Menu(menubar, tearoff=0)
+        toolsmenu.add_command(label="Enable Fast Status", command=self.enable_fast_status)
+        menubar.add_cascade(label="Tools", menu=toolsmenu)
         helpmenu = tk.Menu(menubar, tearoff=0)
         helpmenu.add_command(label="About", command=self.show_about)
         menubar.add_cascade(label="Help", menu=helpmenu)
@@ -170,48 +1944,27 @@ class GitPushGUI:
         ToolTip(init_btn, "Initialize a new git repository in the selected folder.")
         commit_btn = tk.Button(button_frame, text="💾 Commit", command=self.add_and_commit, bg="#FF9800", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
         commit_btn.grid(row=0, column=2, sticky="ew", padx=2, pady=3)
-        ToolTip(commit_btn, "Add all changes and commit with a message.")
+        ToolTip(commit_btn, "Pick files or hunks to stage and commit them.")
         history_btn = tk.Button(button_frame, text="🕑 History", command=self.show_commit_history, bg="#607D8B", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
         history_btn.grid(row=0, column=3, sticky="ew", padx=2, pady=3)
-        ToolTip(history_btn, "Show the last 10 git commits with notes and dates.")
+        ToolTip(history_btn, "Browse and search the commit history of the current branch.")
         push_btn = tk.Button(button_frame, text="🚀 Push", command=self.push_to_github, bg="#4CAF50", fg="white", font=("Arial", 12, "bold"), padx=10, pady=10)
         push_btn.grid(row=0, column=4, sticky="ew", padx=2, pady=3)
         ToolTip(push_btn, "Push the current branch to the remote GitHub repository.")
         clear_btn = tk.Button(button_frame, text="🧹 Clear", command=self.clear_output, bg="#333", fg="white", font=("Arial", 10), padx=10, pady=10)
         clear_btn.grid(row=0, column=5, sticky="ew", padx=2, pady=3)
         ToolTip(clear_btn, "Clear the output terminal.")
-
-        pull_btn = tk.Button(button_frame, text="⬇️ Pull", command=self.pull_from_remote, bg="#388E3C", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        pull_btn.grid(row=1, column=0, sticky="ew", padx=2, pady=3)
-        ToolTip(pull_btn, "Pull latest changes from the remote repository.")
-        new_branch_btn = tk.Button(button_frame, text="🌱 New Branch", command=self.create_new_branch, bg="#1976D2", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        new_branch_btn.grid(row=1, column=1, sticky="ew", padx=2, pady=3)
-        ToolTip(new_branch_btn, "Create and switch to a new branch.")
-        switch_branch_btn = tk.Button(button_frame, text="🔀 Switch Branch", command=self.switch_branch, bg="#455A64", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        switch_branch_btn.grid(row=1, column=2, sticky="ew", padx=2, pady=3)
-        ToolTip(switch_branch_btn, "Switch to another branch.")
-        del_branch_btn = tk.Button(button_frame, text="❌ Del Branch", command=self.delete_branch, bg="#B71C1C", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        del_branch_btn.grid(row=1, column=3, sticky="ew", padx=2, pady=3)
-        ToolTip(del_branch_btn, "Delete a branch.")
-        stash_btn = tk.Button(button_frame, text="📥 Stash", command=self.stash_changes, bg="#8D6E63", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        stash_btn.grid(row=1, column=4, sticky="ew", padx=2, pady=3)
-        ToolTip(stash_btn, "Stash current changes.")
-        pop_stash_btn = tk.Button(button_frame, text="📤 Pop Stash", command=self.apply_stash, bg="#6D4C41", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        pop_stash_btn.grid(row=1, column=5, sticky="ew", padx=2, pady=3)
-        ToolTip(pop_stash_btn, "Apply the latest stash.")
-        stash_list_btn = tk.Button(button_frame, text="📚 Stash List", command=self.show_stash_list, bg="#5D4037", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        stash_list_btn.grid(row=1, column=6, sticky="ew", padx=2, pady=3)
-        ToolTip(stash_list_btn, "Show list of stashes.")
-        diff_btn = tk.Button(button_frame, text="📝 Diff", command=self.show_diff, bg="#0288D1", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        diff_btn.grid(row=1, column=7, sticky="ew", padx=2, pady=3)
-        ToolTip(diff_btn, "Show file differences (git diff).")
-        untracked_btn = tk.Button(button_frame, text="❓ Untracked", command=self.show_untracked_files, bg="#FBC02D", fg="black", font=("Arial", 10, "bold"), padx=10, pady=10)
-        untracked_btn.grid(row=1, column=8, sticky="ew", padx=2, pady=3)
-        ToolTip(untracked_btn, "Show untracked files.")
-        remote_btn = tk.Button(button_frame, text="🌐 Remotes", command=self.show_remotes, bg="#009688", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
-        remote_btn.grid(row=1, column=9, sticky="ew", padx=2, pady=3)
-        ToolTip(remote_btn, "Show remote repositories.")
-        self.all_buttons = [status_btn, init_btn, commit_btn, push_btn, history_btn, clear_btn, pull_btn, new_branch_btn, switch_branch_btn, del_branch_btn, stash_btn, pop_stash_btn, stash_list_btn, diff_btn, untracked_btn, remote_btn]
+        self.cancel_btn = tk.Button(button_frame, text="⛔ Cancel", command=self.cancel_git_command, bg="#333", fg="white", font=("Arial", 10), padx=10, pady=10, state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=6, sticky="ew", padx=2, pady=3)
+        ToolTip(self.cancel_btn, "Cancel the running git command and anything queued behind it.")
+        workspace_btn = tk.Button(button_frame, text="🗂 Workspace", command=self.open_workspace, bg="#5E35B1", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        workspace_btn.grid(row=0, column=7, sticky="ew", padx=2, pady=3)
+        ToolTip(workspace_btn, "Run status, fetch, pull or push across many repositories in parallel.")
+        fetch_btn = tk.Button(button_frame, text="🔄 Fetch", command=self.fetch_from_remote, bg="#00897B", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        fetch_btn.grid(row=0, column=8, sticky="ew", padx=2, pady=3)
+        ToolTip(fetch_btn, "Fetch from the remote and prune deleted branches, with live progress.")
+        self.button_frame = button_frame
+        self.all_buttons = [status_btn, init_btn, commit_btn, push_btn, history_btn, clear_btn, workspace_btn, fetch_btn]
         
 
         output_frame = tk.Frame(main_frame, bg="#2b2b2b")
@@ -231,92 +1984,201 @@ class GitPushGUI:
                                   font=("Consolas", 9), wrap=tk.WORD, state="disabled")
         scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.output_text.yview)
         self.output_text.configure(yscrollcommand=scrollbar.set)
+        self.console = OutputConsole(self.output_text, on_flush=self.console_flushed, recorder=self.recorder)
         
         self.output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        status_bar = tk.Label(self.root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W, bg="#222", fg="#fff", font=("Arial", 9))
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_frame = tk.Frame(self.root, bd=1, relief=tk.SUNKEN, bg="#222")
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        repo_info = tk.Label(status_frame, textvariable=self.repo_info_var, anchor=tk.E, bg="#222", fg="#8be9fd", font=("Arial", 9))
+        repo_info.pack(side=tk.RIGHT, padx=(10, 4))
+        status_bar = tk.Label(status_frame, textvariable=self.status_var, anchor=tk.W, bg="#222", fg="#fff", font=("Arial", 9))
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        git_status = "✅ Git found" if self.git_path != "git" else "⚠️ Git not found in common locations"
+        git_status = f"✅ Git {self.git_info.version} found" if self.git_info.version else "⚠️ Git not found in common locations"
         self.log_output(f"Welcome to Git Push Helper! 🚀\n{git_status}: {self.git_path}\nSelect a repository to get started.\n" + "="*50 + "\n")
     
+    def setup_secondary_buttons(self):
+        """Second button row, built after the first frame is on screen."""
+        button_frame = self.button_frame
+        pull_btn = tk.Button(button_frame, text="⬇️ Pull", command=self.pull_from_remote, bg="#388E3C", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        pull_btn.grid(row=1, column=0, sticky="ew", padx=2, pady=3)
+        ToolTip(pull_btn, "Pull latest changes from the remote repository.")
+        new_branch_btn = tk.Button(button_frame, text="🌱 New Branch", command=self.open_branches, bg="#1976D2", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        new_branch_btn.grid(row=1, column=1, sticky="ew", padx=2, pady=3)
+        ToolTip(new_branch_btn, "Open the branch browser; type a name and create it.")
+        switch_branch_btn = tk.Button(button_frame, text="🔀 Switch Branch", command=self.open_branches, bg="#455A64", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        switch_branch_btn.grid(row=1, column=2, sticky="ew", padx=2, pady=3)
+        ToolTip(switch_branch_btn, "Open the branch browser to find and switch branches.")
+        del_branch_btn = tk.Button(button_frame, text="❌ Del Branch", command=self.open_branches, bg="#B71C1C", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        del_branch_btn.grid(row=1, column=3, sticky="ew", padx=2, pady=3)
+        ToolTip(del_branch_btn, "Open the branch browser to delete a branch.")
+        stash_btn = tk.Button(button_frame, text="📥 Stash", command=self.stash_changes, bg="#8D6E63", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        stash_btn.grid(row=1, column=4, sticky="ew", padx=2, pady=3)
+        ToolTip(stash_btn, "Stash current changes.")
+        pop_stash_btn = tk.Button(button_frame, text="📤 Pop Stash", command=self.apply_stash, bg="#6D4C41", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        pop_stash_btn.grid(row=1, column=5, sticky="ew", padx=2, pady=3)
+        ToolTip(pop_stash_btn, "Apply the latest stash.")
+        stash_list_btn = tk.Button(button_frame, text="📚 Stash List", command=self.show_stash_list, bg="#5D4037", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        stash_list_btn.grid(row=1, column=6, sticky="ew", padx=2, pady=3)
+        ToolTip(stash_list_btn, "Browse stashes: preview, apply, pop or drop any entry.")
+        diff_btn = tk.Button(button_frame, text="📝 Diff", command=self.show_diff, bg="#0288D1", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        diff_btn.grid(row=1, column=7, sticky="ew", padx=2, pady=3)
+        ToolTip(diff_btn, "Browse changed files and view each file's diff.")
+        untracked_btn = tk.Button(button_frame, text="❓ Untracked", command=self.show_untracked_files, bg="#FBC02D", fg="black", font=("Arial", 10, "bold"), padx=10, pady=10)
+        untracked_btn.grid(row=1, column=8, sticky="ew", padx=2, pady=3)
+        ToolTip(untracked_btn, "Show untracked files.")
+        remote_btn = tk.Button(button_frame, text="🌐 Remotes", command=self.show_remotes, bg="#009688", fg="white", font=("Arial", 10, "bold"), padx=10, pady=10)
+        remote_btn.grid(row=1, column=9, sticky="ew", padx=2, pady=3)
+        ToolTip(remote_btn, "Show remote repositories.")
+        self.all_buttons.extend([pull_btn, new_branch_btn, switch_branch_btn, del_branch_btn, stash_btn, pop_stash_btn,
+                                 stash_list_btn, diff_btn, untracked_btn, remote_btn])
+
     def browse_repository(self):
         folder = filedialog.askdirectory(title="Select Git Repository")
         if folder:
-            self.path_var.set(folder)
-            self.repo_path = folder
-            self.log_output(f"Selected repository: {folder}\n")
-            try:
-                cmd = [self.git_path, 'rev-parse', '--abbrev-ref', 'HEAD']
-                result = subprocess.run(cmd, cwd=folder, capture_output=True, text=True, shell=True)
-                if result.returncode == 0:
-                    self.branch_var.set(result.stdout.strip())
-            except Exception as e:
-                self.log_output(f"❌ Error: {str(e)}\n", error=True)
-            try:
-                cmd = [self.git_path, 'remote', 'get-url', 'origin']
-                result = subprocess.run(cmd, cwd=folder, capture_output=True, text=True, shell=True)
-                if result.returncode == 0:
-                    self.remote_var.set(result.stdout.strip())
-                    self.log_output(f"Found remote: {result.stdout.strip()}\n")
-            except Exception as e:
-                self.log_output(f"❌ Error: {str(e)}\n", error=True)
-            self.save_settings()
+            self.select_repository(folder)
+
+    def select_repository(self, folder):
+        self.path_var.set(folder)
+        self.repo_path = folder
+        self.log_output(f"Selected repository: {folder}\n")
+        self.open_repo(folder)
+        self.save_settings()
+
+    def populate_recent_menu(self):
+        self.recent_menu.delete(0, tk.END)
+        recent = self.settings.recent
+        for folder in recent:
+            self.recent_menu.add_command(label=folder, command=lambda folder=folder: self.select_repository(folder))
+        if not recent:
+            self.recent_menu.add_command(label="(none)", state=tk.DISABLED)
+
+    def run_git_command(self, command, success_msg="", on_done=None, read_only=False, progress=None):
+        """Queue a git command on the executor.
 
-    def run_git_command(self, command, success_msg=""):
+        Output streams into the console as it arrives; ``on_done(ok)`` is
+        called on the Tk thread once the command finishes. With a
+        TransferProgress, intermediate ``--progress`` lines update it instead
+        of the console. Returns False when no repository is selected, True
+        otherwise.
+        """
         if not self.repo_path:
             messagebox.showerror("Error", "Please select a repository first!")
             return False
-        self.enable_buttons(False)
-        try:
-            if command[0] == 'git':
-                command[0] = self.git_path
-            self.log_output(f"Running: {' '.join(command)}\n")
-            result = subprocess.run(command, cwd=self.repo_path,
-                                   capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
+        command = self.git_command(command)
+
+        def finished(job):
+            if job.cancelled:
+                self.log_output("⛔ Cancelled\n", error=True)
+            elif job.ok:
                 self.log_output(f"✅ {success_msg}\n")
-                if result.stdout:
-                    self.log_output(f"{result.stdout}\n")
-                return True
             else:
-                self.log_output(f"❌ Error: {result.stderr}\n", error=True)
-                return False
-        except Exception as e:
-            self.log_output(f"❌ Error: {str(e)}\n", error=True)
-            return False
-        finally:
-            self.enable_buttons(True)
+                self.log_output(f"❌ Error: git exited with code {job.returncode}\n", error=True)
+            if on_done:
+                on_done(job.ok)
+
+        queued = self.executor.busy()
+        job, merged = self.executor.submit(command, self.repo_path, finished, read_only=read_only)
+        if progress is not None and not merged:
+            job.progress = progress
+        if merged:
+            self.log_output(f"Already running: {' '.join(command)}\n")
+        else:
+            self.log_output(f"{'Queued' if queued else 'Running'}: {' '.join(command)}\n")
+        return True
+
+    def git_command(self, command):
+        command = list(command)
+        if command[0] == 'git':
+            command[0] = self.git_path
+        return command
+
+    def open_workspace(self):
+        if self.workspace_window is None or not self.workspace_window.exists():
+            self.workspace_window = WorkspaceWindow(self)
+        else:
+            self.workspace_window.win.lift()
 
     def init_git_repo(self):
         self.log_output("\n" + "="*30 + " INITIALIZE GIT " + "="*30 + "\n")
-        if self.run_git_command(['git', 'init'], "Git repository initialized! 🎉"):
+
+        def initialized(ok):
+            if not ok:
+                return
             try:
-                gitignore_path = os.path.join(self.repo_path, '.gitignore')
-                with open(gitignore_path, 'w') as f:
-                    f.write("# Python\n__pycache__/\n*.pyc\n*.pyo\n\n# IDE\n.vscode/\n.idea/\n\n# OS\n.DS_Store\nThumbs.db\n")
+                write_default_gitignore(self.repo_path)
                 self.log_output("Created basic .gitignore file\n")
             except:
                 pass
+
+        self.run_git_command(['git', 'init'], "Git repository initialized! 🎉", initialized)
     
     def check_git_status(self):
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
         self.log_output("\n" + "="*30 + " GIT STATUS " + "="*30 + "\n")
-        self.run_git_command(['git', 'status'], "Status checked")
+        if self.status_window is None or not self.status_window.exists():
+            self.status_window = StatusWindow(self)
+            # repo_state only exists once finish_startup has opened the repository
+            cached = self.repo_state.cached("status") if self.repo_state is not None else None
+            if cached is not None:
+                self.status_window.update(cached)
+        else:
+            self.status_window.win.lift()
+
+        def shown(snap):
+            self.log_output(snap.summary())
+            self.log_output("✅ Status checked\n")
+
+        self.refresh_status(shown)
+
+    def refresh_status(self, on_done=None):
+        """Re-read porcelain v2 status in the background and update the tree."""
+        state = self.repo_state
+        if state is None:
+            return
+
+        def done(job):
+            if state is not self.repo_state:
+                return
+            if not job.ok:
+                self.log_output(f"❌ Error: {job.error_output}", error=True)
+                return
+            state.set("status", job.result, generation)
+            snap = job.result
+            self.update_snapshot(status=snap.summary(), ahead=snap.ahead, behind=snap.behind, upstream=snap.upstream,
+                                 counts={name: len(entries) for name, entries in snap.sections().items()})
+            if self.status_window is not None and self.status_window.exists():
+                self.status_window.update(job.result)
+            if on_done:
+                on_done(job.result)
+
+        generation = state.generation("status")
+        self.executor.submit_call("status", lambda: read_status(self.git_path, state.repo_path), state.repo_path, done, key=())
+
+    def enable_fast_status(self):
+        """Turn on git's untracked cache, plus fsmonitor where git ships one."""
+        self.log_output(f"\n{'='*30} FAST STATUS {'='*30}\n")
+
+        def cache_enabled(ok):
+            if ok and self.git_info.features.get("fsmonitor"):
+                self.run_git_command(['git', 'config', 'core.fsmonitor', 'true'], "Built-in fsmonitor enabled")
+
+        self.run_git_command(['git', 'config', 'core.untrackedCache', 'true'], "Untracked cache enabled", cache_enabled)
     
     def add_and_commit(self):
-        commit_msg = tk.simpledialog.askstring("Commit Message", 
-                                              "Enter commit message:",
-                                              initialvalue="Update files")
-        if not commit_msg:
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
             return
-        
-        self.log_output("\n" + "="*30 + " ADD & COMMIT " + "="*30 + "\n")
-        
-        if self.run_git_command(['git', 'add', '.'], "Files added to staging"):
-            self.run_git_command(['git', 'commit', '-m', commit_msg], 
-                               f"Committed with message: '{commit_msg}'")
-    
+        if self.staging_window is None or not self.staging_window.exists():
+            self.staging_window = StagingWindow(self)
+        else:
+            self.staging_window.win.lift()
+            self.staging_window.refresh()
+
     def push_to_github(self):
         if not self.repo_path:
             messagebox.showerror("Error", "Please select a repository first!")
@@ -328,81 +2190,139 @@ class GitPushGUI:
         if not remote_url:
             messagebox.showerror("Error", "Please enter a GitHub repository URL!")
             return
+        if self.defer_for_fetch(self.push_to_github):
+            return
         
-        def push_async():
-            self.log_output("\n" + "="*30 + " PUSHING TO GITHUB " + "="*30 + "\n")
-            try:
-                cmd = [self.git_path, 'remote', 'get-url', 'origin']
-                result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True, shell=True)
-                if result.returncode == 0:
-                    self.run_git_command(['git', 'remote', 'set-url', 'origin', remote_url], "Remote origin updated")
-                else:
-                    self.run_git_command(['git', 'remote', 'add', 'origin', remote_url], "Remote origin set")
-            except Exception as e:
-                self.run_git_command(['git', 'remote', 'add', 'origin', remote_url], "Remote origin set")
-            self.run_git_command(['git', 'push', '-u', 'origin', branch],
-                                f"Successfully pushed to {branch} branch! 🎉")
-        
-        progress = tk.Toplevel(self.root)
-        progress.title("Pushing...")
-        tk.Label(progress, text="Pushing to GitHub, please wait...", font=("Arial", 12)).pack(padx=20, pady=20)
-        progress.geometry("300x80")
-        progress.transient(self.root)
-        progress.grab_set()
-        progress.update()
-        def thread_target():
-            self.enable_buttons(False)
-            push_async()
-            progress.destroy()
+        if (self.tracking is not None and self.tracking[2] and self.repo_state is not None
+                and self.repo_state.get("branch") == branch):
+            upstream, _, behind = self.tracking
+            if not messagebox.askyesno("Push", f"{upstream} has {behind} commits that are not on {branch} (as of the last fetch), "
+                                       "so the push will be rejected until you pull.\n\nPush anyway?"):
+                return
+
+        self.enable_buttons(False)
+        window = None
+        repo = self.repo_path
+        state = self.repo_state
+
+        def pushed(ok):
+            if window is not None:
+                self.log_output(f"Transfer: {window.close()}\n")
             self.enable_buttons(True)
-        thread = threading.Thread(target=thread_target)
-        thread.daemon = True
-        thread.start()
+
+        def start_push():
+            nonlocal window
+            window = TransferWindow(self, f"Pushing {branch}")
+            self.run_git_command(['git'] + push_command(branch, progress=True),
+                                f"Successfully pushed to {branch} branch! 🎉", pushed,
+                                progress=window.progress)
+
+        def checked(job):
+            if job.cancelled:
+                pushed(False)
+            elif job.ok and job.result:
+                self.log_output(f"Everything up-to-date: origin/{branch} already matches the local branch, nothing to push.\n")
+                pushed(True)
+            else:
+                start_push()
+
+        def remote_ready(ok):
+            # origin was just added or re-pointed: its cached refs say nothing about the new URL, so always push
+            if ok:
+                start_push()
+            else:
+                pushed(False)
+
+        def got_remotes(job):
+            if job.cancelled:
+                pushed(False)
+                return
+            commands = remote_commands(job.result if job.ok else {}, remote_url)
+            if not commands:
+                self.executor.submit_call("push check", lambda: push_is_noop(repo, branch), repo, checked)
+                return
+            message = "Remote origin updated" if commands[0][1] == 'set-url' else "Remote origin set"
+            self.run_git_command(['git'] + commands[0], message, remote_ready)
+
+        self.log_output("\n" + "="*30 + " PUSHING TO GITHUB " + "="*30 + "\n")
+        self.executor.submit_call("remotes", lambda: state.get("remotes") if state is not None else self.backend.remotes(repo),
+                                  repo, got_remotes)
 
     def show_commit_history(self):
-        self.log_output("\n" + "="*30 + " COMMIT HISTORY " + "="*30 + "\n")
-        try:
-            cmd = [self.git_path, 'log', '--pretty=format:%h | %an | %ad | %s', '--date=short', '-n', '10']
-            result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                self.log_output("Hash | Author | Date | Message\n", error=False)
-                self.log_output("-"*80 + "\n", error=False)
-                self.log_output(result.stdout + "\n")
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
+        state = self.repo_state
+        if state is None or state.git_dir is None:
+            messagebox.showerror("Error", "The selected folder is not a git repository.")
+            return
+        branch = state.get("branch")
+        head = state.get("head")
+        key = (state.common_dir, branch)
+        index = self.history_indexes.get(key)
+        if index is None:
+            index = self.history_indexes[key] = CommitIndex.for_branch(self.git_path, self.repo_path, state.common_dir, branch)
+        snapshot = self.settings.snapshot(self.repo_path) or {}
+        preview = [tuple(c) for c in snapshot.get("history", [])] if snapshot.get("branch") == branch else None
+        window = HistoryWindow(self, index, f"Commit History - {branch}", preview)
+
+        def indexed(job):
+            if not job.ok:
+                self.log_output(f"❌ Error: {job.error_output}", error=True)
             else:
-                self.log_output(f"❌ Error: {result.stderr}\n", error=True)
-        except Exception as e:
-            self.log_output(f"❌ Error: {str(e)}\n", error=True)
+                if job.result:
+                    self.set_status(f"History index: {job.result} new commits")
+                if state is self.repo_state and state.get("branch") == branch:
+                    self.update_snapshot(history=[list(c) for c in index.page(0, 50)])
+            window.finished(job.result or 0)
+
+        self.executor.submit_call("history", lambda: index.update(head), self.repo_path, indexed,
+                                  key=(state.common_dir, branch, head))
 
     def clear_output(self):
-        self.output_text.config(state="normal")
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state="disabled")
+        self.console.clear()
         self.set_status("Output cleared.")
 
+    def open_full_output(self):
+        self.console.flush()
+        if not self.console.open_spill():
+            messagebox.showinfo("Output", "No older output has been dropped from the terminal yet.")
+
     def set_status(self, message):
         self.status_var.set(message)
-        self.root.after(4000, lambda: self.status_var.set(""))
+        if self.status_after_id is not None:
+            self.root.after_cancel(self.status_after_id)
+        self.status_after_id = self.root.after(4000, self.clear_status)
+
+    def clear_status(self):
+        self.status_after_id = None
+        self.status_var.set("")
 
     def save_settings(self):
-        data = {
-            "repo_path": self.repo_path,
-            "branch": self.branch_var.get(),
-            "remote": self.remote_var.get()
-        }
-        try:
-            with open("gitpushgui_settings.json", "w") as f:
-                json.dump(data, f)
-        except:
-            pass
+        """Queue a settings write; the store writes it atomically once changes stop for a moment."""
+        self.settings.update(
+            repo_path=self.repo_path,
+            branch=self.branch_var.get(),
+            remote=self.remote_var.get(),
+            console_max_lines=self.console.max_lines,
+            workspace=self.workspace_repos,
+            workspace_concurrency=self.workspace_concurrency,
+            large_file_mb=self.scanner.max_bytes // (1024 * 1024),
+            binary_file_kb=self.scanner.binary_bytes // 1024,
+            auto_fetch=self.auto_fetch_var.get(),
+            fetch_interval_s=self.fetch_scheduler.base_interval
+        )
 
     def load_settings(self):
+        data = self.settings.data
         try:
-            with open("gitpushgui_settings.json", "r") as f:
-                data = json.load(f)
-                self.repo_path = data.get("repo_path", "")
-                self.path_var.set(self.repo_path)
-                self.branch_var.set(data.get("branch", "main"))
-                self.remote_var.set(data.get("remote", ""))
+            self.repo_path = data.get("repo_path", "")
+            self.path_var.set(self.repo_path)
+            self.branch_var.set(data.get("branch", "main"))
+            self.remote_var.set(data.get("remote", ""))
+            self.console.max_lines = max(100, int(data.get("console_max_lines", self.console.max_lines)))
+            self.workspace_repos = list(data.get("workspace", []))
+            self.workspace_concurrency = max(1, int(data.get("workspace_concurrency", 4)))
         except:
             pass
 
@@ -424,30 +2344,39 @@ class GitPushGUI:
         messagebox.showinfo("About Git Push Helper", about_text)
 
     def pull_from_remote(self):
-        self.log_output("\n" + "="*30 + " GIT PULL " + "="*30 + "\n")
-        self.run_git_command(['git', 'pull'], "Pulled latest changes from remote.")
-
-    def create_new_branch(self):
-        branch_name = tk.simpledialog.askstring("New Branch", "Enter new branch name:")
-        if branch_name:
-            self.log_output(f"\n{'='*30} CREATE NEW BRANCH {'='*30}\n")
-            if self.run_git_command(['git', 'checkout', '-b', branch_name], f"Created and switched to branch '{branch_name}'"):
-                self.branch_var.set(branch_name)
-                self.save_settings()
-
-    def switch_branch(self):
-        branch_name = tk.simpledialog.askstring("Switch Branch", "Enter branch name to switch to:")
-        if branch_name:
-            self.log_output(f"\n{'='*30} SWITCH BRANCH {'='*30}\n")
-            if self.run_git_command(['git', 'checkout', branch_name], f"Switched to branch '{branch_name}'"):
-                self.branch_var.set(branch_name)
-                self.save_settings()
-
-    def delete_branch(self):
-        branch_name = tk.simpledialog.askstring("Delete Branch", "Enter branch name to delete:")
-        if branch_name:
-            self.log_output(f"\n{'='*30} DELETE BRANCH {'='*30}\n")
-            self.run_git_command(['git', 'branch', '-d', branch_name], f"Deleted branch '{branch_name}'")
+        self.run_transfer("pull", "Pulled latest changes from remote.")
+
+    def fetch_from_remote(self):
+        self.run_transfer("fetch", "Fetched from remote.")
+
+    def run_transfer(self, operation, success_msg):
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
+        if self.defer_for_fetch(lambda: self.run_transfer(operation, success_msg)):
+            return
+        self.log_output("\n" + "="*30 + f" GIT {operation.upper()} " + "="*30 + "\n")
+        window = TransferWindow(self, f"git {operation}")
+
+        def finished(ok):
+            self.log_output(f"Transfer: {window.close()}\n")
+            if ok:
+                self.fetch_scheduler.reset(fetched=True)
+                self.refresh_tracking()
+
+        self.run_git_command(['git'] + transfer_command(operation, progress=True), success_msg, finished,
+                             progress=window.progress)
+
+    def open_branches(self):
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
+        if self.branch_window is None or not self.branch_window.exists():
+            self.branch_window = BranchWindow(self)
+        else:
+            self.branch_window.win.lift()
+            self.branch_window.entry.focus_set()
+            self.branch_window.refresh()
 
     def stash_changes(self):
         self.log_output(f"\n{'='*30} STASH CHANGES {'='*30}\n")
@@ -458,26 +2387,66 @@ class GitPushGUI:
         self.run_git_command(['git', 'stash', 'pop'], "Applied latest stash.")
 
     def show_stash_list(self):
-        self.log_output(f"\n{'='*30} STASH LIST {'='*30}\n")
-        self.run_git_command(['git', 'stash', 'list'], "Stash list:")
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
+        if self.stash_window is None or not self.stash_window.exists():
+            self.stash_window = StashWindow(self)
+        else:
+            self.stash_window.win.lift()
+            self.stash_window.refresh()
 
     def show_diff(self):
-        self.log_output(f"\n{'='*30} GIT DIFF {'='*30}\n")
-        self.run_git_command(['git', 'diff'], "File differences:")
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
+        if self.diff_window is None or not self.diff_window.exists():
+            self.diff_window = DiffWindow(self)
+        else:
+            self.diff_window.win.lift()
+            self.diff_window.refresh()
 
     def show_untracked_files(self):
+        """List untracked files with their sizes and offer to ignore the ones the scanner flags."""
+        if not self.repo_path:
+            messagebox.showerror("Error", "Please select a repository first!")
+            return
         self.log_output(f"\n{'='*30} UNTRACKED FILES {'='*30}\n")
-        self.run_git_command(['git', 'ls-files', '--others', '--exclude-standard'], "Untracked files:")
+        repo = self.repo_path
+
+        def scanned(job):
+            if not job.ok:
+                self.log_output(f"❌ Error: {job.error_output}", error=True)
+                return
+            files = job.result
+            self.log_output("✅ Untracked files:\n")
+            self.log_output("".join(f"{format_bytes(f.size):>12}  {f.path}{'  ⚠ ' + f.reason if f.reason else ''}\n"
+                                    for f in files) or "(none)\n")
+            flagged = sorted((f for f in files if f.reason), key=lambda f: -f.size)
+            self.log_output(f"{len(files)} files, {format_bytes(sum(f.size for f in files))}, {len(flagged)} flagged\n")
+            if flagged and messagebox.askyesno("Large Files", f"{describe_findings(flagged, self.scanner)}\n\n"
+                                               "Add them to .gitignore?"):
+                self.ignore_files(flagged)
+
+        self.executor.submit_call("untracked scan", lambda: self.scanner.scan(self.git_path, repo, modified=False),
+                                  repo, scanned)
+
+    def ignore_files(self, files):
+        try:
+            added = append_gitignore(self.repo_path, [f.path for f in files])
+        except OSError as e:
+            self.log_output(f"❌ Error: could not update .gitignore: {e}\n", error=True)
+            return
+        if added:
+            self.log_output("Added to .gitignore:\n" + "".join(f"  {line}\n" for line in added))
 
     def show_remotes(self):
         self.log_output(f"\n{'='*30} REMOTE REPOSITORIES {'='*30}\n")
-        self.run_git_command(['git', 'remote', '-v'], "Remote repositories:")
-
-import tkinter.simpledialog
+        self.run_git_command(['git', 'remote', '-v'], "Remote repositories:", read_only=True)
 
 def main():
     root = tk.Tk()
-    app = GitPushGUI(root)
+    app = GitPushGUI(root, STARTED, exit_after_startup="--startup-time" in sys.argv[1:])
     root.mainloop()
 
 if __name__ == "__main__":